@@ -0,0 +1,202 @@
+import argparse
+import json
+import pathlib
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from import_time import compare  # noqa: E402
+
+from linel.database import Database  # noqa: E402
+from linel.generator import WordGenerator, load_default_patterns  # noqa: E402
+
+# Times the Database operations and the word generator on synthetic
+# lexicons, and compares them with a previous run:
+#
+#     python benchmarks/hot_paths.py --output baseline.json
+#     python benchmarks/hot_paths.py --sizes 1000,100000 --baseline baseline.json
+#
+# Lexicons are generated from a fixed seed, so runs of the same commit
+# measure the same data.
+
+SIZES = (1000, 100000, 1000000)
+TYPES = ("Noun", "Verb", "Adjective", "Adverb", "Pronoun", "Particle")
+SEED = 1
+
+
+def synthetic_words(count, seed=SEED):
+    sounds, syllables = load_default_patterns()
+    generator = WordGenerator(sounds, syllables, seed=seed)
+    rng = random.Random(seed)
+
+    for i, word in enumerate(generator.iter_words(count), 1):
+        yield (
+            word,
+            rng.choice(TYPES),
+            f"meaning {i}",
+            str(rng.randint(1, 6)),
+            word[:3],
+            "",
+        )
+
+
+def measure(function, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def result(samples, ops):
+    median = statistics.median(samples)
+    return {
+        "median_ms": round(median, 3),
+        "min_ms": round(min(samples), 3),
+        "ops": ops,
+        "per_op_us": round(median * 1000 / ops, 3),
+        "runs": len(samples),
+    }
+
+
+def bench_database(size, directory, repeat, ops):
+    results = {}
+    rng = random.Random(SEED)
+    words = list(synthetic_words(size))
+
+    db = Database(pathlib.Path(directory) / f"lexicon-{size}.db")
+    samples = measure(lambda: db.bulk_add_words(words), 1)
+    results["bulk_add_words"] = result(samples, size)
+
+    added = []
+    samples = measure(lambda: added.extend(db.add_word(rng.choice(words)) for _ in range(ops)), repeat)
+    results["add_word"] = result(samples, ops)
+
+    samples = measure(db.get_all_words, repeat)
+    results["get_all_words"] = result(samples, db.count_words())
+
+    samples = measure(db.get_word_columns, repeat)
+    results["get_word_columns"] = result(samples, db.count_words())
+
+    def query():
+        for _ in range(ops):
+            db.query_words(word=rng.choice(words)[0])
+
+    results["query_words"] = result(measure(query, repeat), ops)
+
+    for mode in ("prefix", "substring"):
+        def search():
+            for _ in range(ops):
+                db.search_words(mode, word=rng.choice(words)[0][:3])
+
+        results[f"search_words_{mode}"] = result(measure(search, repeat), ops)
+
+    ids = [row[0] for row in added]
+
+    def update():
+        for id in ids[:ops]:
+            db.update_word(id, rng.choice(words))
+
+    results["update_word"] = result(measure(update, repeat), ops)
+
+    def update_many():
+        db.update_words([(id, rng.choice(words)) for id in ids[:ops]])
+
+    results["update_words"] = result(measure(update_many, repeat), ops)
+
+    # Every run deletes rows freshly added for it, outside the timing.
+    def deletes(delete):
+        samples = []
+        for _ in range(repeat):
+            last = db.get_last_word()
+            start_id = last[0] if last else 0
+            db.bulk_add_words(rng.choice(words) for _ in range(ops))
+            ids = list(range(start_id + 1, start_id + ops + 1))
+            samples += measure(lambda: delete(ids), 1)
+        return samples
+
+    def delete(ids):
+        for id in ids:
+            db.delete_word(id)
+
+    results["delete_word"] = result(deletes(delete), ops)
+    results["delete_words"] = result(deletes(db.delete_words), ops)
+
+    db.close()
+    return results
+
+
+def bench_generator(count, repeat):
+    from linel.screens.generator import WordGeneratorScreen
+
+    results = {}
+    screen = WordGeneratorScreen()
+    screen.generator = WordGenerator(screen.default_sounds, screen.default_syllables, seed=SEED)
+
+    def gen_word():
+        for _ in range(count):
+            screen.gen_word()
+
+    results["gen_word"] = result(measure(gen_word, repeat), count)
+
+    results["generate"] = result(
+        measure(lambda: screen.generator.generate(count), repeat), count
+    )
+    results["generate_unique"] = result(
+        measure(lambda: screen.generator.generate(count, unique=True), repeat), count
+    )
+    return results
+
+
+def run(sizes, repeat, ops, words):
+    results = {}
+
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            for case, timing in bench_database(size, directory, repeat, ops).items():
+                results[f"{size}/{case}"] = timing
+
+    for case, timing in bench_generator(words, repeat).items():
+        results[f"generator/{case}"] = timing
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the database and generator hot paths.")
+    parser.add_argument("--sizes", default=",".join(map(str, SIZES)),
+                        help="comma separated lexicon sizes")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--ops", type=int, default=1000, help="operations per timed run")
+    parser.add_argument("--words", type=int, default=10000, help="words generated per timed run")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="JSON file of a previous run to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown over the baseline (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    results = run(sizes, args.repeat, args.ops, args.words)
+    print(json.dumps(results, indent=2))
+
+    if args.output:
+        pathlib.Path(args.output).write_text(json.dumps(results, indent=2))
+
+    if args.baseline:
+        baseline = json.loads(pathlib.Path(args.baseline).read_text())
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"Performance regression: {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
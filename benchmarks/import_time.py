@@ -0,0 +1,113 @@
+import argparse
+import json
+import os
+import pathlib
+import statistics
+import subprocess
+import sys
+
+# Measures the cold import time of the entry points with -X importtime and
+# compares it with a previous run:
+#
+#     python benchmarks/import_time.py --output baseline.json
+#     python benchmarks/import_time.py --baseline benchmarks/import_time.json
+#
+# Most of the time of linel.tui is textual's, and varies by tens of
+# milliseconds between runs, so the number of modules imported is compared
+# too: it does not vary, and grows with every module pulled in before a
+# lexicon is opened.
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+MODULES = ("linel.tui", "linel.cli", "linel.__main__")
+
+
+def import_time(module):
+    # Cumulative time of the module, in microseconds, from a fresh
+    # interpreter so nothing is already imported. Bytecode is written even
+    # when PYTHONDONTWRITEBYTECODE is set, or every run would time the
+    # compilation of the modules changed since their .pyc files.
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    modules = 0
+    for line in result.stderr.splitlines():
+        fields = line.split("|")
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        modules += 1
+        if fields[2].strip() == module:
+            return int(fields[1]), modules
+
+    raise RuntimeError(f"No import time reported for {module}")
+
+
+def run(runs):
+    results = {}
+
+    for module in MODULES:
+        _, modules = import_time(module)  # compiles the .pyc files
+        samples = [import_time(module)[0] / 1000 for _ in range(runs)]
+        results[module] = {
+            "median_ms": round(statistics.median(samples), 2),
+            "min_ms": round(min(samples), 2),
+            "modules": modules,
+            "runs": runs,
+        }
+
+    return results
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+
+    for module, result in results.items():
+        if module not in baseline:
+            continue
+        limit = baseline[module]["median_ms"] * (1 + tolerance)
+        if result["median_ms"] > limit:
+            regressions.append(
+                f"{module}: {result['median_ms']} ms, baseline {baseline[module]['median_ms']} ms"
+            )
+        if "modules" in baseline[module] and result["modules"] > baseline[module]["modules"]:
+            regressions.append(
+                f"{module}: {result['modules']} modules, baseline {baseline[module]['modules']}"
+            )
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the import time of linel.")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="JSON file of a previous run to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown over the baseline (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    results = run(args.runs)
+    print(json.dumps(results, indent=2))
+
+    if args.output:
+        pathlib.Path(args.output).write_text(json.dumps(results, indent=2))
+
+    if args.baseline:
+        baseline = json.loads(pathlib.Path(args.baseline).read_text())
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"Import time regression: {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
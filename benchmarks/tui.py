@@ -0,0 +1,199 @@
+import argparse
+import asyncio
+import json
+import pathlib
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from hot_paths import synthetic_words  # noqa: E402
+from import_time import compare  # noqa: E402
+
+import linel.catalog  # noqa: E402
+from linel.database import Database  # noqa: E402
+from linel.tui import AddDialog, DatabaseSelectionScreen, Home, LinelApp, QuestionDialog, UpdateDialog  # noqa: E402
+
+# Drives LinelApp headlessly with Textual's pilot against seeded lexicons
+# and times what the user waits for, from the input to the updated screen:
+#
+#     python benchmarks/tui.py --output baseline.json
+#     python benchmarks/tui.py --sizes 1000 --baseline baseline.json
+#
+# The app is pointed at a temporary database folder, so the lexicons of
+# linel/database are never opened.
+
+SIZES = (1000, 10000, 100000)
+SCREEN_SIZE = (160, 60)
+TIMEOUT = 60
+
+
+async def wait_for(pilot, condition):
+    # Lets the app process its messages until condition() holds, then
+    # once more so that the change has been rendered.
+    deadline = time.perf_counter() + TIMEOUT
+    while not condition():
+        if time.perf_counter() > deadline:
+            raise TimeoutError("The screen never reached the expected state.")
+        await pilot.pause()
+    await pilot.pause()
+
+
+async def timed(pilot, action, condition):
+    start = time.perf_counter()
+    await action()
+    await wait_for(pilot, condition)
+    return (time.perf_counter() - start) * 1000
+
+
+async def session(db_name, repeat, samples):
+    app = LinelApp()
+    start = time.perf_counter()
+
+    async with app.run_test(size=SCREEN_SIZE) as pilot:
+        await wait_for(pilot, lambda: isinstance(app.screen, DatabaseSelectionScreen))
+        samples["first_paint"].append((time.perf_counter() - start) * 1000)
+
+        app.screen.selection.value = db_name
+        await pilot.pause()
+        samples["open_home"].append(await timed(
+            pilot,
+            lambda: pilot.click("#load"),
+            lambda: isinstance(app.screen, Home) and app.screen.window,
+        ))
+        home = app.screen
+        table = home.linel_list
+        table.focus()
+
+        for i in range(repeat):
+            # Add: from the key press to the dialog, then from Save to the
+            # new row under the cursor.
+            samples["add_dialog"].append(await timed(
+                pilot,
+                lambda: pilot.press("a"),
+                lambda: isinstance(app.screen, AddDialog),
+            ))
+            app.screen.query_one("#word").value = f"benchmark{i}"
+            last_id = home.window[-1][0]
+            samples["add_save"].append(await timed(
+                pilot,
+                lambda: pilot.click("#save"),
+                lambda: app.screen is home and home.window and home.window[-1][0] > last_id,
+            ))
+
+            # Update the row under the cursor, the word just added.
+            samples["update_dialog"].append(await timed(
+                pilot,
+                lambda: pilot.press("u"),
+                lambda: isinstance(app.screen, UpdateDialog),
+            ))
+            english = f"updated {i}"
+            app.screen.query_one("#input-english").value = english
+            samples["update_save"].append(await timed(
+                pilot,
+                lambda: pilot.click("#save"),
+                lambda: app.screen is home and home.window[-1][3] == english,
+            ))
+
+            # Delete it again.
+            samples["delete_dialog"].append(await timed(
+                pilot,
+                lambda: pilot.press("d"),
+                lambda: isinstance(app.screen, QuestionDialog),
+            ))
+            row_count = table.row_count
+            samples["delete_confirm"].append(await timed(
+                pilot,
+                lambda: pilot.click("#yes"),
+                lambda: app.screen is home and table.row_count < row_count,
+            ))
+
+        for _ in range(repeat):
+            samples["search_open"].append(await timed(
+                pilot,
+                lambda: pilot.press("s"),
+                lambda: type(app.screen).__name__ == "QueryScreen",
+            ))
+            query = app.screen
+            query.query_one("#input-mode").value = "substring"
+            query.query_one("#input-english").value = "meaning 1"
+            await pilot.pause()
+            samples["search_results"].append(await timed(
+                pilot,
+                lambda: pilot.click("#search"),
+                lambda: query.linel_list.row_count and not app.workers,
+            ))
+            app.pop_screen()
+            await wait_for(pilot, lambda: app.screen is home)
+
+
+def summary(samples):
+    return {
+        "median_ms": round(statistics.median(samples), 3),
+        "min_ms": round(min(samples), 3),
+        "runs": len(samples),
+    }
+
+
+def run(sizes, repeat, sessions):
+    results = {}
+
+    with tempfile.TemporaryDirectory() as directory:
+        linel.catalog.DATABASE_DIR = pathlib.Path(directory)
+
+        for size in sizes:
+            db_name = f"lexicon-{size}.db"
+            db = Database(pathlib.Path(directory) / db_name)
+            db.bulk_add_words(synthetic_words(size))
+            db.close()
+
+            samples = {}
+            for case in ("first_paint", "open_home", "add_dialog", "add_save", "update_dialog",
+                         "update_save", "delete_dialog", "delete_confirm", "search_open",
+                         "search_results"):
+                samples[case] = []
+            for _ in range(sessions):
+                asyncio.run(session(db_name, repeat, samples))
+
+            for case, timings in samples.items():
+                results[f"{size}/{case}"] = summary(timings)
+
+            (pathlib.Path(directory) / db_name).unlink()
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the responsiveness of the TUI.")
+    parser.add_argument("--sizes", default=",".join(map(str, SIZES)),
+                        help="comma separated lexicon sizes")
+    parser.add_argument("--sessions", type=int, default=3, help="app launches per size")
+    parser.add_argument("--repeat", type=int, default=5, help="edits and searches per launch")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="JSON file of a previous run to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown over the baseline (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    results = run(sizes, args.repeat, args.sessions)
+    print(json.dumps(results, indent=2))
+
+    if args.output:
+        pathlib.Path(args.output).write_text(json.dumps(results, indent=2))
+
+    if args.baseline:
+        baseline = json.loads(pathlib.Path(args.baseline).read_text())
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"Responsiveness regression: {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,25 @@
-from linel.tui import LinelApp
+import sys
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+
+    # --profile[=PATH] records timings, dumped to PATH at exit; see
+    # linel/profiling.py.
+    if argv and argv[0].partition("=")[0] == "--profile":
+        from linel.profiling import profiler
+        profiler.enable(dump_path=argv[0].partition("=")[2] or None)
+        argv = argv[1:]
+
+    # Commands run headless and never import textual.
+    if argv:
+        from linel.cli import main as run_command
+        return run_command(argv)
+
+    from linel.tui import LinelApp
 
-def main():
     app = LinelApp()
     app.run()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,98 @@
+import asyncio
+import queue
+import threading
+
+from linel.connections import connections
+from linel.database import FUZZY_DISTANCE, Database, iter_search_rows, read, search_query
+
+
+class AsyncDatabase:
+    # Runs every Database call on a dedicated thread that owns the SQLite
+    # connection. Calls are queued in order and awaited from the event loop:
+    #
+    #     word = await db.get_word_by_id(3)
+    #     await db.run(lambda database: ...)  # several calls in one request
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path
+        self._requests = queue.SimpleQueue()
+        self._thread = threading.Thread(
+            target=self._serve,
+            name=f"linel-db-{db_path}",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def __getattr__(self, name):
+        method = getattr(Database, name, None)
+        if name.startswith("_") or not callable(method):
+            raise AttributeError(name)
+
+        async def call(*args, **kwargs):
+            return await self.run(method, *args, **kwargs)
+
+        call.__name__ = name
+        return call
+
+    def run(self, function, *args, **kwargs):
+        # function is called as function(database, *args, **kwargs) on the
+        # database thread, so it can group work with database.transaction().
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._requests.put((loop, future, function, args, kwargs))
+        return future
+
+    def reading(self):
+        return connections.reading(self.db_path)
+
+    def iter_search_words(self, mode="exact", word=None, type=None, english=None, class_decl=None, root=None,
+                          distance=FUZZY_DISTANCE, chunk_size=200, connection=None):
+        # Searches are streamed from the shared read connection (see
+        # reading) instead of going through the request queue.
+        query, parameters = search_query(mode, word, type, english, class_decl, root, distance)
+        result = read(connection, query, parameters)
+        return iter_search_rows(result, mode, word, root, distance, chunk_size)
+
+    def close(self, wait=False):
+        # Pending requests are still served before the connection is closed.
+        self._requests.put(None)
+        if wait:
+            self._thread.join()
+
+    def _serve(self):
+        try:
+            database = Database(self.db_path)
+            error = None
+        except Exception as exception:
+            database = None
+            error = exception
+
+        while True:
+            request = self._requests.get()
+            if request is None:
+                break
+
+            loop, future, function, args, kwargs = request
+            if error:
+                loop.call_soon_threadsafe(_set_exception, future, error)
+                continue
+
+            try:
+                result = function(database, *args, **kwargs)
+            except Exception as exception:
+                loop.call_soon_threadsafe(_set_exception, future, exception)
+            else:
+                loop.call_soon_threadsafe(_set_result, future, result)
+
+        if database:
+            database.close()
+
+
+def _set_result(future, result):
+    if not future.cancelled():
+        future.set_result(result)
+
+
+def _set_exception(future, exception):
+    if not future.cancelled():
+        future.set_exception(exception)
@@ -0,0 +1,146 @@
+import json
+import os
+import pathlib
+
+# Metadata of the lexicons of a folder, cached in a JSON file next to them
+# so that listing them does not open every database:
+#
+#     catalog = Catalog(database_dir())
+#     catalog.entries()    # from the cache, instantly
+#     catalog.refresh()    # only re-reads the files that changed
+#
+# A file is read again when the mtime or size of it or of its WAL changes;
+# writes in WAL mode may leave the main file untouched until a checkpoint.
+
+DATABASE_DIR = pathlib.Path(__file__).parent / "database"
+
+CATALOG_NAME = ".catalog.json"
+CATALOG_VERSION = 1
+
+
+def database_dir():
+    # Created on first use rather than at import time.
+    DATABASE_DIR.mkdir(exist_ok=True)
+    return DATABASE_DIR
+
+
+def file_signature(db_path):
+    signature = []
+    for path in (db_path, db_path.with_name(db_path.name + "-wal")):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            signature += [0, 0]
+        else:
+            signature += [stat.st_mtime_ns, stat.st_size]
+    return signature
+
+
+def read_metadata(db_path):
+    # Opened read-only, so a file is never created, converted to WAL or
+    # migrated just to be listed. sqlite3 is only imported here, once the
+    # catalog is refreshed, so that listing the cache stays cheap to import.
+    import sqlite3
+
+    from linel.migrations import schema_version
+
+    metadata = {"words": None, "version": None, "error": None}
+    try:
+        db = sqlite3.connect(f"{db_path.resolve().as_uri()}?mode=ro", uri=True)
+        try:
+            metadata["version"] = schema_version(db)
+            metadata["words"] = db.execute("SELECT COUNT(*) FROM words;").fetchone()[0]
+        finally:
+            db.close()
+    except sqlite3.Error as error:
+        metadata["error"] = str(error)
+    return metadata
+
+
+class Catalog:
+    def __init__(self, directory, path=None):
+        self.directory = pathlib.Path(directory)
+        self.path = pathlib.Path(path) if path else self.directory / CATALOG_NAME
+        self._entries = self._load()
+
+    def entries(self):
+        # The cached entries of the .db files present now, by name. Files
+        # that are not in the cache yet only have their name, size and mtime.
+        entries = []
+        for db_path in self._db_paths():
+            entry = self._entries.get(db_path.name)
+            if entry is None:
+                entry = self._stat_entry(db_path)
+            entries.append(entry)
+        return entries
+
+    def refresh(self):
+        # Returns the names of the files that were read again.
+        changed = []
+        entries = {}
+
+        for db_path in self._db_paths():
+            signature = file_signature(db_path)
+            entry = self._entries.get(db_path.name)
+
+            if entry is None or entry["signature"] != signature:
+                entry = self._stat_entry(db_path)
+                entry.update(read_metadata(db_path))
+                # Files that could not be read, e.g. while locked, are tried
+                # again on the next refresh.
+                if not entry["error"]:
+                    entry["signature"] = signature
+                changed.append(db_path.name)
+            entries[db_path.name] = entry
+
+        if changed or entries.keys() != self._entries.keys():
+            self._entries = entries
+            self._save()
+        return changed
+
+    def _db_paths(self):
+        try:
+            return sorted(
+                self.directory / entry.name
+                for entry in os.scandir(self.directory)
+                if entry.name.endswith(".db") and entry.is_file()
+            )
+        except FileNotFoundError:
+            return []
+
+    def _stat_entry(self, db_path):
+        try:
+            stat = db_path.stat()
+        except FileNotFoundError:
+            size = mtime = None
+        else:
+            size, mtime = stat.st_size, stat.st_mtime
+        return {
+            "name": db_path.name,
+            "size": size,
+            "mtime": mtime,
+            "words": None,
+            "version": None,
+            "error": None,
+            "signature": None,
+        }
+
+    def _load(self):
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get("version") != CATALOG_VERSION:
+            return {}
+        return {entry["name"]: entry for entry in data.get("entries", [])}
+
+    def _save(self):
+        # Written to a temporary file first, so that an interrupted write
+        # never leaves a truncated catalog.
+        data = {"version": CATALOG_VERSION, "entries": list(self._entries.values())}
+        temporary = self.path.with_name(self.path.name + ".tmp")
+        try:
+            temporary.write_text(json.dumps(data, indent=1), encoding="utf-8")
+            os.replace(temporary, self.path)
+        except OSError:
+            temporary.unlink(missing_ok=True)
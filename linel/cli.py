@@ -0,0 +1,245 @@
+import argparse
+import pathlib
+import sys
+
+from linel.catalog import DATABASE_DIR
+from linel.database import EXPORT_FORMATS, FUZZY_DISTANCE, SEARCH_MODES, Database, write_words
+
+# Headless entry points for batch jobs. Nothing here imports textual, so a
+# command starts in milliseconds:
+#
+#     python -m linel import-csv lexicon.db data.csv
+#     python -m linel import-csv lexicon.db data.csv --upsert word,type
+#     python -m linel query lexicon.db --english live --mode substring --format jsonl
+#     python -m linel query lexicon.db --word marvi --mode fuzzy --distance 2
+#     python -m linel export lexicon.db > lexicon.csv
+#     python -m linel export lexicon.db --format sqlite --output snapshot.db
+#     python -m linel generate --count 100000 --seed 1 --unique --db lexicon.db
+#     python -m linel paradigms lexicon.db --rules paradigms.txt
+#     python -m linel paradigms lexicon.db --form varaki
+#     python -m linel family lexicon.db varak
+
+
+def resolve_db(path, must_exist=True):
+    # A bare file name that is not in the current directory can also refer
+    # to a lexicon of the database folder used by the TUI.
+    db_path = pathlib.Path(path)
+    if not db_path.exists() and (DATABASE_DIR / db_path).exists():
+        db_path = DATABASE_DIR / db_path
+
+    if must_exist and not db_path.exists():
+        raise SystemExit(f"linel: database not found: {path}")
+    return db_path
+
+
+def open_db(path, must_exist=True):
+    db_path = resolve_db(path, must_exist)
+    existed = db_path.exists()
+    db = Database(db_path)
+
+    # Lexicons created by an older linel are upgraded on open.
+    if existed:
+        for version, description, elapsed in db.migrations:
+            print(f"{db_path.name}: migrated to version {version}, {description} ({elapsed:.3f}s)",
+                  file=sys.stderr)
+    return db
+
+
+def import_csv(args):
+    db = open_db(args.db, must_exist=False)
+
+    # Bad keys, files without a word column, text that is not UTF-8 and
+    # lexicons with duplicate keys are reported without a traceback.
+    try:
+        if args.remove_duplicates:
+            removed = db.remove_duplicates(args.upsert or "word,type")
+            print(f"Removed {removed} duplicate words.", file=sys.stderr)
+
+        report = db.import_csv(args.csv, chunk_size=args.chunk_size, upsert_key=args.upsert)
+    except (OSError, ValueError) as error:
+        raise SystemExit(f"linel: {error}")
+
+    print(
+        f"Imported {report.inserted} words ({report.rows_per_sec:.0f} rows/sec), "
+        f"updated {report.updated}, unchanged {report.unchanged}, skipped {report.skipped}.",
+        file=sys.stderr,
+    )
+    if report.error_path:
+        print(f"Skipped rows were written to {report.error_path}.", file=sys.stderr)
+
+
+def export(args):
+    db = open_db(args.db)
+
+    if args.output:
+        db.export_file(args.output, args.format, chunk_size=args.chunk_size)
+    elif args.format == "sqlite":
+        raise SystemExit("linel: --format sqlite needs --output")
+    else:
+        db.export(sys.stdout, args.format, chunk_size=args.chunk_size)
+
+
+def query(args):
+    db = open_db(args.db)
+    chunks = db.iter_search_words(
+        args.mode,
+        args.word,
+        args.type,
+        args.english,
+        args.class_decl,
+        args.root,
+        args.distance,
+        chunk_size=args.chunk_size,
+    )
+    write_words(chunks, args.format, sys.stdout)
+
+
+def paradigms(args):
+    from linel.morphology import format_rule, parse_rules
+
+    db = open_db(args.db)
+
+    if args.rules:
+        try:
+            rules = parse_rules(pathlib.Path(args.rules).read_text(encoding="utf-8"))
+        except ValueError as error:
+            raise SystemExit(f"linel: {args.rules}: {error}")
+        forms = db.set_paradigm_rules(rules)
+        print(f"Loaded {len(rules)} rules, {forms} forms.", file=sys.stderr)
+    elif args.word:
+        for word in db.query_words(word=args.word):
+            for name, form in db.paradigm(word.id):
+                print(f"{word.word}\t{name}\t{form}")
+    elif args.form:
+        for word, name in db.lookup_form(args.form):
+            print(f"{args.form}\t{name}\t{word.word}")
+    else:
+        for rule in db.get_paradigm_rules():
+            print(format_rule(rule))
+
+
+def family(args):
+    db = open_db(args.db)
+
+    if args.root:
+        write_words([db.root_family(args.root)], args.format, sys.stdout)
+    else:
+        for root, count in db.families(args.min_size):
+            print(f"{root}\t{count}")
+
+
+def generate(args):
+    from linel.generator import WordEnumerator, WordGenerator, load_default_patterns
+
+    sounds, syllables = load_default_patterns()
+    if args.sounds:
+        sounds = pathlib.Path(args.sounds).read_text()
+    if args.syllables:
+        syllables = pathlib.Path(args.syllables).read_text()
+
+    try:
+        if args.enumerate:
+            enumerator = WordEnumerator(sounds, syllables)
+        else:
+            generator = WordGenerator(sounds, syllables, seed=args.seed)
+    except ValueError as error:
+        raise SystemExit(f"linel: {error}")
+
+    if args.enumerate:
+        stop = None if args.count is None else args.start + args.count
+        words = (word for _, word in enumerator.iter_words(args.start, stop))
+    else:
+        existing = open_db(args.db).get_word_set() if args.unique and args.db else ()
+        words = generator.iter_words(args.count or 10, unique=args.unique, exclude=existing)
+
+    out = sys.stdout
+    for word in words:
+        out.write(word)
+        out.write("\n")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m linel",
+        description="Run without a command to start the TUI.",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    command = commands.add_parser("import-csv", help="bulk import a CSV with the data.csv header")
+    command.add_argument("db")
+    command.add_argument("csv")
+    command.add_argument("--chunk-size", type=int, default=1000)
+    command.add_argument(
+        "--upsert",
+        metavar="COLUMNS",
+        help="update the words matching these columns, e.g. word,type, instead of adding them again",
+    )
+    command.add_argument(
+        "--remove-duplicates",
+        action="store_true",
+        help="first keep only the oldest word per --upsert key (default word,type)",
+    )
+    command.set_defaults(run=import_csv)
+
+    command = commands.add_parser("export", help="write every word to stdout or a file")
+    command.add_argument("db")
+    command.add_argument("--format", choices=EXPORT_FORMATS, default="csv")
+    command.add_argument("--output", help="file to write instead of stdout")
+    command.add_argument("--chunk-size", type=int, default=1000)
+    command.set_defaults(run=export)
+
+    command = commands.add_parser("query", help="search words and write them to stdout")
+    command.add_argument("db")
+    command.add_argument("--word")
+    command.add_argument("--type")
+    command.add_argument("--english")
+    command.add_argument("--class-decl")
+    command.add_argument("--root")
+    command.add_argument("--mode", choices=SEARCH_MODES, default="exact")
+    command.add_argument("--distance", type=int, default=FUZZY_DISTANCE,
+                         help="largest edit distance of --mode fuzzy")
+    command.add_argument("--format", choices=("csv", "jsonl"), default="csv")
+    command.add_argument("--chunk-size", type=int, default=1000)
+    command.set_defaults(run=query)
+
+    command = commands.add_parser(
+        "paradigms",
+        help="load paradigm rules, or list the rules, the forms of a word or the words of a form",
+    )
+    command.add_argument("db")
+    group = command.add_mutually_exclusive_group()
+    group.add_argument("--rules", metavar="FILE", help="replace the rules with those of this file")
+    group.add_argument("--word", help="list the forms of this word")
+    group.add_argument("--form", help="list the words that have this form")
+    command.set_defaults(run=paradigms)
+
+    command = commands.add_parser("family", help="list the words of a root, or the largest families")
+    command.add_argument("db")
+    command.add_argument("root", nargs="?")
+    command.add_argument("--min-size", type=int, default=2, help="smallest family listed without a root")
+    command.add_argument("--format", choices=("csv", "jsonl"), default="csv")
+    command.set_defaults(run=family)
+
+    command = commands.add_parser("generate", help="write generated words to stdout")
+    command.add_argument("--count", type=int)
+    command.add_argument("--seed", type=int)
+    command.add_argument("--sounds", help="defaults to phonology/sounds.txt")
+    command.add_argument("--syllables", help="defaults to phonology/syllables.txt")
+    command.add_argument("--unique", action="store_true", help="never repeat a word")
+    command.add_argument("--db", help="with --unique, also skip the words of this lexicon")
+    command.add_argument("--enumerate", action="store_true", help="list the space in order")
+    command.add_argument("--start", type=int, default=0, help="offset to enumerate from")
+    command.set_defaults(run=generate)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    try:
+        args.run(args)
+    except BrokenPipeError:
+        # The output was piped into a command that stopped reading early.
+        sys.stderr.close()
+    return 0
@@ -0,0 +1,166 @@
+import atexit
+import pathlib
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+# Pragmas of every connection. WAL lets readers run while a write is in
+# progress, and with it synchronous=NORMAL only syncs at checkpoints.
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL;",
+    "PRAGMA synchronous=NORMAL;",
+    "PRAGMA mmap_size=268435456;",  # 256 MiB
+    "PRAGMA cache_size=-65536;",  # 64 MiB
+    "PRAGMA temp_store=MEMORY;",
+)
+
+
+def connect(db_path, read_only=False):
+    if read_only and str(db_path) != ":memory:":
+        # Reading a file never creates it or switches it to WAL; that is
+        # left to its writer.
+        uri = f"{pathlib.Path(db_path).resolve().as_uri()}?mode=ro"
+        connection = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        pragmas = [pragma for pragma in PRAGMAS if "journal_mode" not in pragma]
+    else:
+        connection = sqlite3.connect(db_path, check_same_thread=False)
+        pragmas = PRAGMAS
+
+    for pragma in pragmas:
+        connection.execute(pragma)
+    if read_only:
+        connection.execute("PRAGMA query_only=ON;")
+    return connection
+
+
+class Writer:
+    # The write connection of a file and the state of its transaction,
+    # which belong to the connection rather than to the Database objects
+    # sharing it: a write of one joins the transaction another has open on
+    # the same thread, and waits for it to finish on other threads, so
+    # nobody commits or rolls back someone else's partial work.
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.lock = threading.RLock()
+        self.depth = 0
+
+    @contextmanager
+    def transaction(self):
+        # Committed once when the outermost transaction exits, or rolled
+        # back on error.
+        with self.lock:
+            self.depth += 1
+            try:
+                yield self.connection
+            except BaseException:
+                self.depth -= 1
+                if not self.depth:
+                    self.connection.rollback()
+                raise
+            else:
+                self.depth -= 1
+                if not self.depth:
+                    self.connection.commit()
+
+
+class ConnectionPool:
+    # Caches the connections of each database file so that opening the same
+    # lexicon again reuses them:
+    #
+    #     writer = connections.writer(path)    # one per file, shared by its users
+    #     with writer.transaction() as db:
+    #         db.execute(...)
+    #     connections.release(path)            # closed once the last user is done
+    #
+    #     with connections.reading(path) as reader:
+    #         reader.execute(...)
+    #
+    # The reader is a separate read-only connection, so searches see the
+    # last committed state without waiting for writes. Readings of a file
+    # take turns on it, which also keeps reader.interrupt() from reaching
+    # anything but the reading in progress.
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._writers = {}
+        self._users = {}
+        self._readers = {}
+
+    def writer(self, db_path):
+        key = _key(db_path)
+        with self._lock:
+            if key not in self._writers:
+                self._writers[key] = Writer(connect(db_path))
+                self._users[key] = 0
+            self._users[key] += 1
+            return self._writers[key]
+
+    @contextmanager
+    def reading(self, db_path):
+        key = _key(db_path)
+        while True:
+            with self._lock:
+                if key not in self._readers:
+                    self._readers[key] = (connect(db_path, read_only=True), threading.Lock())
+                reader, lock = self._readers[key]
+
+            lock.acquire()
+            # release() may have closed the reader while this was waiting.
+            if self._readers.get(key, (None,))[0] is reader:
+                break
+            lock.release()
+
+        try:
+            yield reader
+        finally:
+            lock.release()
+
+    def release(self, db_path):
+        key = _key(db_path)
+        with self._lock:
+            if key not in self._users:
+                return
+            self._users[key] -= 1
+            if self._users[key]:
+                return
+            del self._users[key]
+            writer = self._writers.pop(key)
+            reader = self._readers.pop(key, None)
+
+        _close(writer.connection)
+        if reader:
+            # Waits for a reading in progress on another thread.
+            with reader[1]:
+                _close(reader[0])
+
+    def close_all(self):
+        with self._lock:
+            connections = [
+                *(writer.connection for writer in self._writers.values()),
+                *(reader for reader, _ in self._readers.values()),
+            ]
+            self._writers.clear()
+            self._users.clear()
+            self._readers.clear()
+
+        for connection in connections:
+            _close(connection)
+
+
+def _key(db_path):
+    if str(db_path) == ":memory:":
+        return ":memory:"
+    return str(pathlib.Path(db_path).resolve())
+
+
+def _close(connection):
+    try:
+        connection.execute("PRAGMA optimize;")
+    except sqlite3.Error:
+        pass
+    connection.close()
+
+
+connections = ConnectionPool()
+atexit.register(connections.close_all)
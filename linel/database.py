@@ -1,49 +1,449 @@
+import array
+import csv
+import itertools
+import json
+import operator
 import pathlib
 import sqlite3
+import time
+from contextlib import contextmanager
 
-BASE_DIR = pathlib.Path(__file__).parent
-DATABASE_DIR = BASE_DIR / "database"
+from linel.catalog import database_dir
+from linel.connections import connections
+from linel.migrations import migrate
+from linel.morphology import PARADIGM_COLUMNS
+from linel.profiling import profiler
+
+WORD_COLUMNS = ("word", "type", "english", "class_decl", "root", "notes")
+WORD_RECORD_FIELDS = ("id", *WORD_COLUMNS)
+
+# Columns with few distinct values, which get_word_columns() stores once
+# and shares between rows.
+INTERNED_COLUMNS = ("type", "class_decl")
+
+SEARCH_MODES = ("exact", "prefix", "substring", "ranked", "fuzzy", "form")
+
+# Schema version a lexicon needs for the modes that use the tables of later
+# migrations: full-text search, trigrams and paradigm forms. The others
+# only need the words table, which lexicons had before versioning.
+SEARCH_SCHEMA_VERSIONS = {"substring": 3, "ranked": 3, "fuzzy": 4, "form": 5}
+
+EXPORT_FORMATS = ("csv", "jsonl", "sqlite")
+
+FULL_TEXT_COLUMNS = ("word", "english", "notes")
+
+# The trigram tokenizer can only match terms of at least three characters.
+MIN_FULL_TEXT_TERM = 3
+
+# Fuzzy search finds the words and roots within an edit distance of the
+# ones searched, through the trigrams of the word_grams table.
+FUZZY_COLUMNS = ("word", "root")
+FUZZY_DISTANCE = 1
+GRAM_SIZE = 3
+
+# Indexes the trigrams of the words added after an id, see bulk_add_words.
+INDEX_NEW_GRAMS = """
+    INSERT OR IGNORE INTO word_grams
+    SELECT '{field}', substr('  ' || {field} || '  ', n, 3), id
+    FROM words, gram_positions
+    WHERE id > ? AND n <= length({field}) + 2 AND {field} != '';
+"""
+
+# Adds the paradigm forms of the words added after an id, see
+# bulk_add_words and linel.morphology.
+INDEX_NEW_FORMS = """
+    INSERT INTO word_forms
+    SELECT words.id, paradigm_rules.id,
+           prefix || substr({stem}, 1, max(0, length({stem}) - strip)) || suffix
+    FROM words JOIN paradigm_rules
+    ON paradigm_rules.type = words.type
+    AND paradigm_rules.class_decl IN (coalesce(words.class_decl, ''), '*')
+    WHERE words.id > ? AND coalesce({stem}, '') != '';
+""".format(stem="CASE base WHEN 'root' THEN words.root ELSE words.word END")
+
+# Rows looked up per query when an upsert import classifies a chunk, small
+# enough to stay under SQLite's limit on bound variables.
+UPSERT_LOOKUP_PARAMETERS = 900
+
+
+class ImportCancelled(Exception):
+    pass
+
+
+class WordRecord(tuple):
+    # A row of the words table. It is still a tuple, so rows can be
+    # unpacked, sliced and compared as before, and __slots__ keeps it as
+    # small as one; the columns can also be read by name: record.word.
+    __slots__ = ()
+
+    def __new__(cls, id, word, type, english, class_decl, root, notes):
+        return tuple.__new__(cls, (id, word, type, english, class_decl, root, notes))
+
+    def __repr__(self):
+        return "WordRecord(" + ", ".join(
+            f"{column}={value!r}" for column, value in zip(WORD_RECORD_FIELDS, self)
+        ) + ")"
+
+    def __getnewargs__(self):
+        return tuple(self)
+
+    @classmethod
+    def from_row(cls, cursor, row):
+        # The row_factory of the cursors that select words.*.
+        return tuple.__new__(cls, row)
+
+    id = property(operator.itemgetter(0))
+    word = property(operator.itemgetter(1))
+    type = property(operator.itemgetter(2))
+    english = property(operator.itemgetter(3))
+    class_decl = property(operator.itemgetter(4))
+    root = property(operator.itemgetter(5))
+    notes = property(operator.itemgetter(6))
+
+
+class ImportReport:
+    def __init__(self, inserted=0, skipped=0, elapsed=0.0, updated=0, unchanged=0):
+        self.inserted = inserted
+        self.skipped = skipped
+        self.elapsed = elapsed
+        self.updated = updated
+        self.unchanged = unchanged
+        # How far into the source the import is, e.g. in bytes of a CSV
+        # file, when its size is known.
+        self.position = 0
+        self.size = 0
+        self.error_path = None
+
+    def __repr__(self):
+        return (
+            f"ImportReport(inserted={self.inserted}, updated={self.updated}, "
+            f"unchanged={self.unchanged}, skipped={self.skipped}, elapsed={self.elapsed:.3f})"
+        )
+
+    @property
+    def rows_per_sec(self):
+        if not self.elapsed:
+            return 0.0
+        return (self.inserted + self.updated + self.unchanged) / self.elapsed
+
+
+def validate_record(record):
+    # Returns (word, None) for a valid record or (None, error).
+    if isinstance(record, dict):
+        # csv.DictReader collects extra fields under None and fills the
+        # missing ones of a short row with None.
+        if None in record:
+            return None, "too many fields"
+        missing = [column for column, value in record.items() if value is None]
+        if missing:
+            return None, "missing fields: " + ", ".join(missing)
+        word = tuple(record.get(column) or "" for column in WORD_COLUMNS)
+    else:
+        word = tuple(record)
+        if len(word) != len(WORD_COLUMNS):
+            return None, f"expected {len(WORD_COLUMNS)} fields, got {len(word)}"
+
+    if not word[0]:
+        return None, "empty word"
+    return word, None
+
+
+def parse_key(key):
+    # "word,type" -> ("word", "type")
+    if isinstance(key, str):
+        key = key.split(",")
+    key = tuple(column.strip() for column in key if column.strip())
+
+    unknown = [column for column in key if column not in WORD_COLUMNS]
+    if not key or unknown:
+        raise ValueError(f"Invalid key {', '.join(key)!r}, use columns of {', '.join(WORD_COLUMNS)}.")
+    return key
+
+
+def trigrams(text):
+    # Distinct trigrams of the text padded with two spaces on each side,
+    # as stored in word_grams.
+    padded = f"  {text}  "
+    return sorted({padded[i:i + GRAM_SIZE] for i in range(len(text) + 2)})
+
+
+def edit_distance(a, b, limit=None):
+    # Levenshtein distance; past limit it stops early and returns limit + 1.
+    if limit is not None and abs(len(a) - len(b)) > limit:
+        return limit + 1
+
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b),
+            ))
+        if limit is not None and min(current) > limit:
+            return limit + 1
+        previous = current
+
+    return previous[-1]
+
+
+def search_query(mode, word=None, type=None, english=None, class_decl=None, root=None,
+                 distance=FUZZY_DISTANCE):
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"Unknown search mode: {mode}")
+
+    fields = {
+        "word": word,
+        "type": type,
+        "english": english,
+        "class_decl": class_decl,
+        "root": root,
+    }
+    where_clauses = []
+    parameters = []
+    match_terms = []
+
+    for column, value in fields.items():
+        if not value:
+            continue
+
+        if (
+            mode == "exact"
+            or (mode == "ranked" and column not in FULL_TEXT_COLUMNS)
+            or (mode == "fuzzy" and column not in FUZZY_COLUMNS)
+            or (mode == "form" and column != "word")
+        ):
+            where_clauses.append(f"words.{column} = ?")
+            parameters.append(value)
+        elif mode == "fuzzy":
+            # Candidates only: each edit changes at most GRAM_SIZE of the
+            # trigrams, so a close word shares at least the rest of them.
+            # iter_search_rows() then checks the actual distance.
+            where_clauses.append(f"length(words.{column}) BETWEEN ? AND ?")
+            parameters += [len(value) - distance, len(value) + distance]
+
+            grams = trigrams(value)
+            shared = len(grams) - GRAM_SIZE * distance
+            if shared > 0:
+                where_clauses.append(
+                    "words.id IN (SELECT word_id FROM word_grams "
+                    f"WHERE field = ? AND gram IN ({', '.join('?' * len(grams))}) "
+                    "GROUP BY word_id HAVING COUNT(*) >= ?)"
+                )
+                parameters += [column, *grams, shared]
+        elif mode == "form":
+            # The word itself or any of its paradigm forms.
+            where_clauses.append(
+                "(words.word = ? OR words.id IN (SELECT word_id FROM word_forms WHERE form = ?))"
+            )
+            parameters += [value, value]
+        elif mode == "prefix":
+            # A range on the column lets SQLite use the B-tree index.
+            where_clauses.append(f"words.{column} >= ? AND words.{column} < ?")
+            parameters += [value, value[:-1] + chr(ord(value[-1]) + 1)]
+        elif column in FULL_TEXT_COLUMNS and len(value) >= MIN_FULL_TEXT_TERM:
+            quoted = value.replace('"', '""')
+            match_terms.append(f'{column} : "{quoted}"')
+        else:
+            where_clauses.append(f"instr(lower(words.{column}), lower(?)) > 0")
+            parameters.append(value)
+
+    if match_terms:
+        query = (
+            "SELECT words.* FROM words_fts "
+            "JOIN words ON words.id = words_fts.rowid"
+        )
+        where_clauses.insert(0, "words_fts MATCH ?")
+        parameters.insert(0, " AND ".join(match_terms))
+    else:
+        query = "SELECT words.* FROM words"
+
+    if where_clauses:
+        query += " WHERE " + " AND ".join(where_clauses)
+
+    if match_terms and mode == "ranked":
+        query += " ORDER BY bm25(words_fts)"
+    else:
+        query += " ORDER BY words.id"
+
+    return query, parameters
+
+
+def read(connection, query, parameters=()):
+    # Runs a read; while profiling, it is timed through the fetching of
+    # its rows rather than up to the return of execute().
+    if profiler.enabled:
+        return profiler.cursor("query", query, connection.execute, query, parameters)
+    return connection.execute(query, parameters)
+
+
+def iter_rows(result, chunk_size):
+    while True:
+        chunk = result.fetchmany(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+def iter_search_rows(result, mode, word=None, root=None, distance=FUZZY_DISTANCE, chunk_size=200):
+    # Streams the rows of a search_query() result. Fuzzy results are
+    # checked against the edit distance and come closest first.
+    result.row_factory = WordRecord.from_row
+    if mode != "fuzzy" or not (word or root):
+        yield from iter_rows(result, chunk_size)
+        return
+
+    found = []
+    for row in result:
+        distances = [
+            edit_distance(value or "", searched, distance)
+            for value, searched in ((row.word, word), (row.root, root))
+            if searched
+        ]
+        if max(distances) <= distance:
+            found.append((sum(distances), row.id, row))
+
+    found.sort()
+    for start in range(0, len(found), chunk_size):
+        yield [row for _, _, row in found[start:start + chunk_size]]
+
+
+def write_words(chunks, format, out):
+    # CSV uses the header of data.csv, so an export can be imported again.
+    if format == "csv":
+        # The stream translates newlines itself, e.g. to \r\n on Windows.
+        writer = csv.writer(out, lineterminator="\n")
+        writer.writerow(WORD_COLUMNS)
+        for words in chunks:
+            writer.writerows(word[1:] for word in words)
+    elif format == "jsonl":
+        for words in chunks:
+            for word in words:
+                out.write(json.dumps(dict(zip(("id", *WORD_COLUMNS), word)), ensure_ascii=False))
+                out.write("\n")
+    else:
+        raise ValueError(f"Unknown export format: {format}")
 
-DATABASE_DIR.mkdir(exist_ok=True)
 
 class Database:
     def __init__(self, db_path=None):
         if db_path:
             self.db_path = db_path
         else:
-            self.db_path = DATABASE_DIR / "nuovo.db"
+            self.db_path = database_dir() / "nuovo.db"
 
-        self.db = sqlite3.connect(db_path)
+        # Database objects of the same file share its connection, and with
+        # it its transaction; see connections.Writer.
+        self._writer = connections.writer(self.db_path)
+        self.db = self._writer.connection
         self.cursor = self.db.cursor()
-        self._create_table()
 
-    def _create_table(self):
-        query = """
-            CREATE TABLE IF NOT EXISTS words(
-                id INTEGER PRIMARY KEY,
-                word TEXT,
-                type TEXT,
-                english TEXT,
-                class_decl TEXT, 
-                root TEXT,
-                notes TEXT
-            );
-        """
-        self._run_query(query)
+        # Brings lexicons created by older versions up to date.
+        with self._writer.lock:
+            self.migrations = migrate(self.db, pathlib.Path(self.db_path).name)
+
+    @contextmanager
+    def transaction(self):
+        # Writes issued inside the block are committed once when the
+        # outermost transaction exits, or rolled back on error.
+        with self._writer.transaction():
+            yield self
 
     def get_all_words(self):
-        result = self._run_query("SELECT * FROM words;")
+        result = self._read_words("SELECT * FROM words;")
         return result.fetchall()
 
+    def iter_words(self, chunk_size=1000):
+        result = self._read_words("SELECT * FROM words ORDER BY id;")
+        return iter_rows(result, chunk_size)
+
+    def get_word_columns(self, chunk_size=10000):
+        # The whole table column by column, for large in-memory views: the
+        # ids in an array of 64-bit integers and the other columns in lists,
+        # where the values of INTERNED_COLUMNS are stored once however many
+        # rows share them.
+        columns = {"id": array.array("q")}
+        columns.update((column, []) for column in WORD_COLUMNS)
+        shared = {column: {} for column in INTERNED_COLUMNS}
+
+        result = self._read_query(f"SELECT {', '.join(WORD_RECORD_FIELDS)} FROM words ORDER BY id;")
+        for rows in iter_rows(result, chunk_size):
+            for column, values in zip(WORD_RECORD_FIELDS, zip(*rows)):
+                if column in shared:
+                    intern = shared[column].setdefault
+                    values = [intern(value, value) for value in values]
+                columns[column].extend(values)
+
+        return columns
+
+    def count_words(self):
+        return self._read_query("SELECT COUNT(*) FROM words;").fetchone()[0]
+
+    def export(self, out, format="csv", chunk_size=1000, progress=None):
+        # Rows are streamed from the cursor chunk by chunk, so memory does
+        # not grow with the lexicon. progress is called as progress(done, total).
+        chunks = self.iter_words(chunk_size)
+
+        if progress:
+            chunks = self._report_progress(chunks, progress)
+
+        write_words(chunks, format, out)
+
+    def export_file(self, path, format="csv", chunk_size=1000, progress=None):
+        if format == "sqlite":
+            self.export_snapshot(path, progress)
+            return
+
+        with open(path, "w", newline="", encoding="utf-8") as out:
+            self.export(out, format, chunk_size, progress)
+
+    def export_snapshot(self, path, progress=None):
+        # Copies the database page by page with the backup API, then
+        # compacts the copy.
+        def report(status, remaining, total):
+            progress(total - remaining, total)
+
+        snapshot = sqlite3.connect(path)
+        try:
+            self.db.backup(snapshot, pages=1024, progress=report if progress else None)
+            snapshot.execute("VACUUM;")
+        finally:
+            snapshot.close()
+
+    def _report_progress(self, chunks, progress):
+        total = self.count_words()
+        done = 0
+
+        progress(done, total)
+        for words in chunks:
+            yield words
+            done += len(words)
+            progress(done, total)
+
+    def get_word_set(self):
+        result = self._read_query("SELECT DISTINCT word FROM words;")
+        return {word for word, in result}
+
+    def get_words_page(self, after_id, limit):
+        query = "SELECT * FROM words WHERE id > ? ORDER BY id LIMIT ?;"
+        result = self._read_words(query, after_id, limit)
+        return result.fetchall()
+
+    def get_words_page_before(self, before_id, limit):
+        query = "SELECT * FROM words WHERE id < ? ORDER BY id DESC LIMIT ?;"
+        result = self._read_words(query, before_id, limit)
+        return result.fetchall()[::-1]
+
     def get_last_word(self):
-        result = self._run_query(
+        result = self._read_words(
             "SELECT * FROM words ORDER BY id DESC LIMIT 1;"
         )
         return result.fetchone()
     
     def get_word_by_id(self, word_id):
         query = "SELECT * FROM words WHERE id = ?;"
-        result = self._run_query(query, word_id)
+        result = self._read_words(query, word_id)
         return result.fetchone()
     
     def query_words(self, word=None, type=None, english=None, class_decl=None, root=None):
@@ -70,14 +470,311 @@ class Database:
         if where_clauses:
             query += " WHERE " + " AND ".join(where_clauses)
 
-        result = self._run_query(query, *parameters)
+        result = self._read_words(query, *parameters)
+        return result.fetchall()
+
+    def search_words(self, mode="exact", word=None, type=None, english=None, class_decl=None, root=None,
+                     distance=FUZZY_DISTANCE):
+        chunks = self.iter_search_words(mode, word, type, english, class_decl, root, distance)
+        return [row for rows in chunks for row in rows]
+
+    def iter_search_words(self, mode="exact", word=None, type=None, english=None, class_decl=None, root=None,
+                          distance=FUZZY_DISTANCE, chunk_size=200, connection=None):
+        # Yields the results in chunks; passing the connection of reading()
+        # lets the search run on another thread and be cancelled with
+        # connection.interrupt().
+        query, parameters = search_query(mode, word, type, english, class_decl, root, distance)
+        if connection:
+            result = read(connection, query, parameters)
+        else:
+            result = self._read_query(query, *parameters)
+        return iter_search_rows(result, mode, word, root, distance, chunk_size)
+
+    def near_duplicates(self, words, distance=FUZZY_DISTANCE):
+        # Maps each of the words that is within distance of a word of the
+        # lexicon to the closest one, e.g. to screen generated words.
+        close = {}
+        for word in words:
+            found = self.search_words("fuzzy", word=word, distance=distance)
+            if found:
+                close[word] = found[0].word
+        return close
+
+    def reading(self):
+        return connections.reading(self.db_path)
+
+    def root_family(self, root):
+        # The words derived from a root, through idx_words_root.
+        result = self._read_words("SELECT * FROM words WHERE root = ? ORDER BY id;", root)
+        return result.fetchall()
+
+    def families(self, min_size=2):
+        # (root, number of words) of the roots shared by at least min_size
+        # words, the largest families first.
+        result = self._read_query(
+            "SELECT root, COUNT(*) FROM words WHERE root != '' GROUP BY root "
+            "HAVING COUNT(*) >= ? ORDER BY COUNT(*) DESC, root;",
+            min_size,
+        )
+        return result.fetchall()
+
+    def get_paradigm_rules(self):
+        result = self._read_query(
+            f"SELECT {', '.join(PARADIGM_COLUMNS)} FROM paradigm_rules ORDER BY id;"
+        )
         return result.fetchall()
 
+    def set_paradigm_rules(self, rules):
+        # Replaces the rules, see linel.morphology.parse_rules(); the
+        # triggers of paradigm_rules build the forms of the new ones.
+        with self.transaction():
+            self._run_query("DELETE FROM word_forms;")
+            self._run_query("DELETE FROM paradigm_rules;")
+            self._run_many(
+                f"INSERT INTO paradigm_rules ({', '.join(PARADIGM_COLUMNS)}) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?);",
+                rules,
+            )
+        return self.count_forms()
+
+    def count_forms(self):
+        return self._read_query("SELECT COUNT(*) FROM word_forms;").fetchone()[0]
+
+    def paradigm(self, word_id):
+        # (form name, form) of a word, in the order of its rules.
+        result = self._read_query(
+            "SELECT paradigm_rules.name, word_forms.form FROM word_forms "
+            "JOIN paradigm_rules ON paradigm_rules.id = word_forms.rule_id "
+            "WHERE word_forms.word_id = ? ORDER BY word_forms.rule_id;",
+            word_id,
+        )
+        return result.fetchall()
+
+    def lookup_form(self, form):
+        # (word row, form name) of every word that has form among its
+        # paradigm forms.
+        result = self._read_query(
+            "SELECT words.*, paradigm_rules.name FROM word_forms "
+            "JOIN words ON words.id = word_forms.word_id "
+            "JOIN paradigm_rules ON paradigm_rules.id = word_forms.rule_id "
+            "WHERE word_forms.form = ? ORDER BY words.id, word_forms.rule_id;",
+            form,
+        )
+        return [(WordRecord(*row[:-1]), row[-1]) for row in result]
+
     def add_word(self, word):
-        self._run_query(
+        result = self._run_query(
             "INSERT INTO words VALUES (NULL, ?, ?, ?, ?, ?, ?);",
             *word,
         )
+        return self.get_word_by_id(result.lastrowid)
+
+    def bulk_add_words(self, records, chunk_size=1000, progress=None, rejected=None, upsert_key=None):
+        # Records can be tuples in column order or mappings such as the rows
+        # of a csv.DictReader. Invalid records are skipped and passed to
+        # rejected(row_number, record, error). progress(report) is called
+        # after every chunk; returning False cancels the import and rolls
+        # it back.
+        #
+        # With upsert_key, e.g. ("word", "type"), a record whose key is
+        # already in the lexicon updates that word instead of adding a new
+        # one, and only the rows that actually changed are written.
+        report = ImportReport()
+        start = time.perf_counter()
+        rows = iter(records)
+        row_number = 0
+
+        if upsert_key:
+            upsert_key = parse_key(upsert_key)
+            seen_keys = set()
+            key_positions = [WORD_COLUMNS.index(column) for column in upsert_key]
+
+        with self.transaction():
+            if upsert_key:
+                upsert_index, created_index = self._prepare_upsert_key(upsert_key)
+
+            # Indexing the new words and their paradigm forms in one pass at
+            # the end is about twice as fast as the per-row triggers.
+            last_id = self._read_query("SELECT MAX(id) FROM words;").fetchone()[0] or 0
+            self._run_query("INSERT INTO word_grams_deferred VALUES (1);")
+
+            while True:
+                chunk = list(itertools.islice(rows, chunk_size))
+                if not chunk:
+                    break
+
+                words = []
+                for record in chunk:
+                    row_number += 1
+                    word, error = validate_record(record)
+
+                    if not error and upsert_key:
+                        key = tuple(word[position] for position in key_positions)
+                        if key in seen_keys:
+                            error = "duplicate key " + ", ".join(key)
+                        seen_keys.add(key)
+
+                    if error:
+                        report.skipped += 1
+                        if rejected:
+                            rejected(row_number, record, error)
+                    else:
+                        words.append(word)
+
+                if upsert_key:
+                    self._upsert_words(words, upsert_key, upsert_index, report)
+                else:
+                    self._run_many(
+                        "INSERT INTO words VALUES (NULL, ?, ?, ?, ?, ?, ?);",
+                        words,
+                    )
+                    report.inserted += len(words)
+                report.elapsed = time.perf_counter() - start
+
+                if progress and progress(report) is False:
+                    raise ImportCancelled
+
+            for field in FUZZY_COLUMNS:
+                self._run_query(INDEX_NEW_GRAMS.format(field=field), last_id)
+            self._run_query(INDEX_NEW_FORMS, last_id)
+            self._run_query("DELETE FROM word_grams_deferred;")
+            if upsert_key and created_index:
+                self._run_query(f"DROP INDEX {upsert_index};")
+
+        report.elapsed = time.perf_counter() - start
+        return report
+
+    def _prepare_upsert_key(self, key):
+        # Returns the index to look the key up through, and whether it was
+        # created for this import. Words are nearly unique, so keys that
+        # include the word use its index; the others get an index for the
+        # length of the import, dropped at its end since it would slow down
+        # every later write to the lexicon.
+        created = False
+        if "word" in key:
+            index = "idx_words_word"
+        else:
+            index = f"idx_upsert_{'_'.join(key)}"
+            self._run_query(f"CREATE INDEX IF NOT EXISTS {index} ON words({', '.join(key)});")
+            created = True
+
+        duplicate = self._read_query(
+            f"SELECT 1 FROM words WHERE {' AND '.join(column + ' IS NOT NULL' for column in key)} "
+            f"GROUP BY {', '.join(key)} HAVING COUNT(*) > 1 LIMIT 1;"
+        ).fetchone()
+        if duplicate:
+            raise ValueError(
+                f"The lexicon already has several words with the same {'+'.join(key)}; "
+                "remove the duplicates before updating it from a file."
+            )
+        return index, created
+
+    def _upsert_words(self, words, key, index, report):
+        # Classify the chunk against the words already stored, looking them
+        # up through the key index, then write only new and changed rows.
+        key_positions = [WORD_COLUMNS.index(column) for column in key]
+        existing = {}
+        batch_size = max(1, UPSERT_LOOKUP_PARAMETERS // len(key))
+
+        for start in range(0, len(words), batch_size):
+            batch = words[start:start + batch_size]
+            values = ", ".join(["(" + ", ".join("?" * len(key)) + ")"] * len(batch))
+            join = " AND ".join(
+                f"words.{column} = keys.column{number}" for number, column in enumerate(key, 1)
+            )
+            result = self._read_query(
+                f"SELECT {', '.join('words.' + column for column in WORD_RECORD_FIELDS)} "
+                f"FROM (VALUES {values}) AS keys JOIN words INDEXED BY {index} ON {join};",
+                *(word[position] for word in batch for position in key_positions),
+            )
+            for stored in result:
+                existing[tuple(stored[position + 1] for position in key_positions)] = stored
+
+        updates = [column for column in WORD_COLUMNS if column not in key]
+        update_positions = [WORD_COLUMNS.index(column) for column in updates]
+        inserted = []
+        updated = []
+        for word in words:
+            stored = existing.get(tuple(word[position] for position in key_positions))
+            if stored is None:
+                report.inserted += 1
+                inserted.append(word)
+            elif stored[1:] != word:
+                report.updated += 1
+                updated.append((*(word[position] for position in update_positions), stored[0]))
+            else:
+                report.unchanged += 1
+
+        self._run_many("INSERT INTO words VALUES (NULL, ?, ?, ?, ?, ?, ?);", inserted)
+        if updates:
+            self._run_many(
+                f"UPDATE words SET {', '.join(column + ' = ?' for column in updates)} WHERE id = ?;",
+                updated,
+            )
+
+    def remove_duplicates(self, key):
+        # Keeps the oldest word of every group sharing the same key.
+        key = parse_key(key)
+        result = self._run_query(
+            f"DELETE FROM words WHERE id NOT IN "
+            f"(SELECT MIN(id) FROM words GROUP BY {', '.join(key)});"
+        )
+        return result.rowcount
+
+    def import_csv(self, path, chunk_size=1000, progress=None, error_path=None, upsert_key=None):
+        # Rejected rows are written next to the CSV, to <name>.errors.csv
+        # by default, with their row number and the reason.
+        path = pathlib.Path(path)
+        error_path = pathlib.Path(error_path or path.with_suffix(".errors.csv"))
+        size = path.stat().st_size
+        position = 0
+        errors = None
+
+        # Read as bytes so that progress counts bytes, like the size of the
+        # file, and decoded line by line as UTF-8 without the byte order mark
+        # spreadsheets put in front of the header.
+        with open(path, "rb") as csvfile:
+            def lines():
+                nonlocal position
+                for line in csvfile:
+                    position += len(line)
+                    yield line.decode("utf-8-sig" if position == len(line) else "utf-8")
+
+            reader = csv.DictReader(lines())
+            if not reader.fieldnames or "word" not in reader.fieldnames:
+                raise ValueError(f"{path.name} has no 'word' column.")
+
+            def reject(row_number, record, error):
+                nonlocal errors, error_writer
+                if errors is None:
+                    errors = open(error_path, "w", newline='', encoding="utf-8")
+                    error_writer = csv.writer(errors)
+                    error_writer.writerow(["row", "error", *reader.fieldnames])
+                values = [record.get(field) for field in reader.fieldnames]
+                error_writer.writerow([row_number, error, *values, *record.get(None, [])])
+
+            def report_progress(report):
+                report.position = position
+                report.size = size
+                if progress:
+                    return progress(report)
+
+            error_writer = None
+            try:
+                report = self.bulk_add_words(reader, chunk_size, report_progress, reject, upsert_key)
+            except BaseException:
+                # Nothing was imported, so the error report would be stale.
+                if errors:
+                    errors.close()
+                    error_path.unlink(missing_ok=True)
+                raise
+            if errors:
+                errors.close()
+
+        report.position = report.size = size
+        if errors:
+            report.error_path = error_path
+        return report
 
     def update_word(self, word_id, updated_word):
         query = """
@@ -86,6 +783,20 @@ class Database:
         WHERE id = ?;
         """
         self._run_query(query, *updated_word, word_id)
+        return self.get_word_by_id(word_id)
+
+    def update_words(self, updates):
+        query = """
+        UPDATE words
+        SET word = ?, type = ?, english = ?, class_decl = ?, root = ?, notes = ?
+        WHERE id = ?;
+        """
+        with self.transaction():
+            self._run_many(
+                query,
+                [(*updated_word, word_id) for word_id, updated_word in updates],
+            )
+            return [self.get_word_by_id(word_id) for word_id, _ in updates]
 
     def delete_word(self, id):
         self._run_query(
@@ -93,10 +804,49 @@ class Database:
             id,
         )
     
+    def delete_words(self, ids):
+        with self.transaction():
+            self._run_many(
+                "DELETE FROM words WHERE id=(?);",
+                [(id,) for id in ids],
+            )
+
     def clear_all_words(self):
         self._run_query("DELETE FROM words;")
 
+    def close(self):
+        connections.release(self.db_path)
+
+    def _read_words(self, query, *query_args):
+        # For queries of words.*, whose rows are returned as WordRecords.
+        result = self._read_query(query, *query_args)
+        result.row_factory = WordRecord.from_row
+        return result
+
+    def _read_query(self, query, *query_args):
+        return read(self.db, query, [*query_args])
+
     def _run_query(self, query, *query_args):
-        result = self.cursor.execute(query, [*query_args])
-        self.db.commit()
-        return result
\ No newline at end of file
+        # Committed straight away outside of transactions.
+        with self._writer.transaction():
+            if profiler.enabled:
+                return self._profile(self.cursor.execute, query, query_args)
+            return self.cursor.execute(query, [*query_args])
+
+    def _run_many(self, query, rows):
+        # Only used inside transactions, which commit themselves.
+        if not profiler.enabled:
+            return self.cursor.executemany(query, rows)
+
+        start = time.perf_counter()
+        result = self.cursor.executemany(query, rows)
+        profiler.record("query", query, time.perf_counter() - start, result.rowcount)
+        return result
+
+    def _profile(self, execute, query, query_args):
+        # Writes are done once execute() returns; reads go through read().
+        start = time.perf_counter()
+        result = execute(query, [*query_args])
+        rows = result.rowcount if result.rowcount >= 0 else None
+        profiler.record("query", query, time.perf_counter() - start, rows)
+        return result
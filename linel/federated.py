@@ -0,0 +1,116 @@
+import os
+import pathlib
+import queue
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from linel.connections import connections
+from linel.database import FUZZY_DISTANCE, SEARCH_SCHEMA_VERSIONS, iter_search_rows, read, search_query
+from linel.migrations import SCHEMA_VERSION, schema_version
+
+MAX_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
+_DONE = object()
+
+
+def lexicon_paths(directory):
+    return sorted(pathlib.Path(directory).glob("*.db"))
+
+
+class FederatedSearch:
+    # Runs one search over several lexicons at once, each file on its own
+    # thread and shared read connection. SQLite releases the GIL while it
+    # searches, so the whole search takes about as long as the slowest file:
+    #
+    #     search = FederatedSearch(lexicon_paths(database_dir()))
+    #     for source, rows in search.run("fuzzy", word="marvi"):
+    #         ...
+    #     search.errors    # [(source, message)] of the files that failed
+    #
+    # Chunks arrive in the order the files produce them. cancel() can be
+    # called from any thread and interrupts the queries in progress.
+
+    def __init__(self, db_paths, max_workers=MAX_WORKERS):
+        self.db_paths = [pathlib.Path(db_path) for db_path in db_paths]
+        self.max_workers = max_workers
+        self.errors = []
+        self._cancelled = threading.Event()
+        self._lock = threading.Lock()
+        self._active = set()
+
+    def run(self, mode="exact", word=None, type=None, english=None, class_decl=None, root=None,
+            distance=FUZZY_DISTANCE, chunk_size=200):
+        if not self.db_paths:
+            return
+
+        self.errors = []
+        self._cancelled.clear()
+        results = queue.SimpleQueue()
+        search = (mode, word, type, english, class_decl, root, distance, chunk_size)
+
+        with ThreadPoolExecutor(min(self.max_workers, len(self.db_paths))) as pool:
+            for db_path in self.db_paths:
+                pool.submit(self._search, db_path, search, results)
+
+            try:
+                remaining = len(self.db_paths)
+                while remaining:
+                    result = results.get()
+                    if result is _DONE:
+                        remaining -= 1
+                    else:
+                        yield result
+            finally:
+                # Also stops the threads when the caller stops early.
+                self.cancel()
+
+    def cancel(self):
+        self._cancelled.set()
+        with self._lock:
+            for connection in self._active:
+                try:
+                    connection.interrupt()
+                except sqlite3.ProgrammingError:
+                    pass
+
+    def _search(self, db_path, search, results):
+        mode, word, type, english, class_decl, root, distance, chunk_size = search
+        source = db_path.stem
+
+        try:
+            if self._cancelled.is_set():
+                return
+
+            # Lexicons are only read: one that is too old for the search is
+            # reported rather than upgraded, which opening it in linel does.
+            with connections.reading(db_path) as connection:
+                version = schema_version(connection)
+                needed = SEARCH_SCHEMA_VERSIONS.get(mode, 0)
+                if version > SCHEMA_VERSION:
+                    raise ValueError(f"schema version {version} is newer than this linel supports")
+                if version < needed:
+                    raise ValueError(
+                        f"schema version {version} is too old for a {mode} search; "
+                        "open it in linel to upgrade it"
+                    )
+
+                with self._lock:
+                    self._active.add(connection)
+                try:
+                    query, parameters = search_query(mode, word, type, english, class_decl, root, distance)
+                    chunks = iter_search_rows(
+                        read(connection, query, parameters), mode, word, root, distance, chunk_size,
+                    )
+                    for rows in chunks:
+                        if self._cancelled.is_set():
+                            break
+                        results.put((source, rows))
+                finally:
+                    with self._lock:
+                        self._active.discard(connection)
+        except (sqlite3.Error, ValueError) as error:
+            if not self._cancelled.is_set():
+                self.errors.append((source, str(error)))
+        finally:
+            results.put(_DONE)
@@ -0,0 +1,389 @@
+import hashlib
+import itertools
+import pathlib
+import random
+import re
+from collections import Counter, OrderedDict
+
+from linel.profiling import profiler
+
+BASE_DIR = pathlib.Path(__file__).parent
+PHONOLOGY_DIR = BASE_DIR / "phonology"
+
+# sounds.txt holds one category per line, e.g. "C=p,t:3,k", where ":3" gives
+# a sound three times the default weight of 1. A sound may use other
+# categories ("A=aC,V"), also recursively, up to MAX_DEPTH levels. Lines
+# starting with "!" list banned clusters: "!tt,shs".
+MAX_DEPTH = 8
+GRAMMAR_CACHE_SIZE = 16
+
+# Nested categories of up to this many sounds are listed by WordEnumerator
+# rather than walked for every word.
+MAX_LISTED_SOUNDS = 4096
+
+# Rounds in a row without a single new word before generate() gives up, for
+# grammars whose filters or dedupe leave nothing more to produce.
+MAX_STALLED_ROUNDS = 20
+
+
+def load_default_patterns():
+    sounds_file = PHONOLOGY_DIR / "sounds.txt"
+    syllables_file = PHONOLOGY_DIR / "syllables.txt"
+
+    sounds = sounds_file.read_text() if sounds_file.exists() else ""
+    syllables = syllables_file.read_text() if syllables_file.exists() else ""
+    return sounds, syllables
+
+
+def parse_categories(text):
+    categories = {}
+
+    for line in text.splitlines():
+        phrase = line.split("=")
+        if len(phrase) == 2 and not line.startswith("!"):
+            categories[phrase[0].strip()] = [parse_sound(sound) for sound in phrase[1].split(",")]
+
+    return categories
+
+
+def parse_sound(text):
+    sound, _, weight = text.strip().partition(":")
+    if not weight:
+        return sound, 1.0
+
+    # Weights below 0, or nan and infinity, would skew the sampling
+    # rather than fail.
+    try:
+        value = float(weight)
+    except ValueError:
+        value = None
+    if value is None or not 0 <= value < float("inf"):
+        raise ValueError(f"Invalid weight for sound {sound!r}: {weight!r}")
+    return sound, value
+
+
+def parse_banned(text):
+    banned = []
+
+    for line in text.splitlines():
+        if line.startswith("!"):
+            banned += [cluster.strip() for cluster in line[1:].split(",") if cluster.strip()]
+
+    return banned
+
+
+def parse_structures(text):
+    return [line.strip() for line in text.splitlines() if line.strip()]
+
+
+class _TooDeep(Exception):
+    pass
+
+
+class Category:
+    __slots__ = ("name", "options", "cum_weights", "nested")
+
+    def __init__(self, name, options=(), cum_weights=None, nested=False):
+        self.name = name
+        self.options = list(options)
+        self.cum_weights = cum_weights
+        self.nested = nested
+
+
+class Grammar:
+    # Compiled form of a sounds/syllables pair. Options of a category are
+    # plain strings, or tuples of strings and Category objects when they
+    # refer to other categories.
+
+    def __init__(self, sounds, syllables):
+        self.categories = parse_categories(sounds)
+        self.structures = parse_structures(syllables)
+        self.banned = parse_banned(sounds)
+
+        if not self.structures:
+            raise ValueError("No syllable structures to generate words from.")
+
+        compiled = {name: Category(name) for name in self.categories}
+
+        for name, sounds in self.categories.items():
+            category = compiled[name]
+            total = 0.0
+            category.cum_weights = []
+
+            for sound, weight in sounds:
+                parts = tuple(compiled.get(symbol, symbol) for symbol in sound)
+                if any(isinstance(part, Category) for part in parts):
+                    category.options.append(parts)
+                    category.nested = True
+                else:
+                    category.options.append(sound)
+                total += weight
+                category.cum_weights.append(total)
+
+            if not total:
+                raise ValueError(f"Category {name!r} has no sound with a positive weight.")
+
+            # Uniform categories skip the bisection over cumulative weights.
+            if len({weight for _, weight in sounds}) == 1:
+                category.cum_weights = None
+
+        # A symbol of a structure that is not a category is a literal sound.
+        self.slots = [
+            tuple(compiled.get(symbol) or Category(symbol, [symbol]) for symbol in structure)
+            for structure in self.structures
+        ]
+        self.banned_pattern = (
+            re.compile("|".join(map(re.escape, self.banned))) if self.banned else None
+        )
+
+
+_grammar_cache = OrderedDict()
+
+
+def compile_grammar(sounds, syllables):
+    key = hashlib.sha1(f"{sounds}\0{syllables}".encode()).hexdigest()
+
+    if key in _grammar_cache:
+        _grammar_cache.move_to_end(key)
+        return _grammar_cache[key]
+
+    grammar = Grammar(sounds, syllables)
+    _grammar_cache[key] = grammar
+    if len(_grammar_cache) > GRAMMAR_CACHE_SIZE:
+        _grammar_cache.popitem(last=False)
+    return grammar
+
+
+class WordGenerator:
+    # Samples words a whole batch at a time: for every structure drawn n
+    # times, each slot is filled with a single rng.choices(k=n) call instead
+    # of one random.choice per character.
+
+    def __init__(self, sounds, syllables, seed=None, max_depth=MAX_DEPTH):
+        self.grammar = compile_grammar(sounds, syllables)
+        self.categories = self.grammar.categories
+        self.structures = self.grammar.structures
+        self.rng = random.Random(seed)
+        self.max_depth = max_depth
+
+    def generate(self, count, unique=False, exclude=()):
+        # With unique, words already in the batch or in exclude (e.g. the
+        # words of the lexicon) are dropped and replaced by new ones.
+        seen = set(exclude) if unique else None
+        return self._generate(count, seen)
+
+    def iter_words(self, count=None, batch_size=10000, unique=False, exclude=()):
+        # Streams words batch by batch; without a count it never stops.
+        seen = set(exclude) if unique else None
+
+        while count is None or count > 0:
+            size = batch_size if count is None else min(batch_size, count)
+            words = self._generate(size, seen)
+            if not words:
+                break
+            yield from words
+            if count is not None:
+                count -= len(words)
+
+    def _generate(self, count, seen):
+        words = []
+        stalled = 0
+
+        with profiler.timed("generator", "WordGenerator.generate"):
+            while len(words) < count and stalled < MAX_STALLED_ROUNDS:
+                found = len(words)
+
+                for word in self._sample(count - len(words)):
+                    if seen is not None:
+                        if word in seen:
+                            continue
+                        seen.add(word)
+                    words.append(word)
+
+                stalled = stalled + 1 if len(words) == found else 0
+
+        return words
+
+    def _sample(self, count):
+        picks = Counter(self.rng.choices(range(len(self.grammar.slots)), k=count))
+        words = []
+
+        for structure, n in picks.items():
+            slots = self.grammar.slots[structure]
+            columns = [self.rng.choices(slot.options, cum_weights=slot.cum_weights, k=n) for slot in slots]
+
+            if any(slot.nested for slot in slots):
+                for sounds in zip(*columns):
+                    try:
+                        words.append("".join(self._expand(sound, 1) for sound in sounds))
+                    except _TooDeep:
+                        pass
+            else:
+                words.extend(map("".join, zip(*columns)))
+
+        if self.grammar.banned_pattern:
+            words = [word for word in words if not self.grammar.banned_pattern.search(word)]
+
+        self.rng.shuffle(words)
+        return words
+
+    def _expand(self, sound, depth):
+        if isinstance(sound, str):
+            return sound
+        if depth > self.max_depth:
+            raise _TooDeep
+
+        parts = []
+        for part in sound:
+            if isinstance(part, Category):
+                option = self.rng.choices(part.options, cum_weights=part.cum_weights)[0]
+                parts.append(self._expand(option, depth + 1))
+            else:
+                parts.append(part)
+        return "".join(parts)
+
+
+class WordEnumerator:
+    # Walks the whole space of a grammar in order instead of sampling it.
+    # Every structure is a mixed-radix number whose digits pick the sound of
+    # each slot, so a word is addressed by an offset and enumeration can be
+    # resumed from any offset with constant memory. Counts are of the raw
+    # space: words with banned clusters are counted but never yielded.
+
+    def __init__(self, sounds, syllables, max_depth=MAX_DEPTH):
+        self.grammar = compile_grammar(sounds, syllables)
+        self.max_depth = max_depth
+        self._sizes = {}
+        self._options = {}
+        self._sounds = {}
+
+        with profiler.timed("generator", "WordEnumerator.count"):
+            self.counts = [
+                _product(self._size(slot, 1) for slot in slots)
+                for slots in self.grammar.slots
+            ]
+            self.total = sum(self.counts)
+
+    def structure_counts(self):
+        return list(zip(self.grammar.structures, self.counts))
+
+    def iter_words(self, start=0, stop=None):
+        # Yields (offset, word) pairs, so a caller can resume at offset + 1.
+        stop = self.total if stop is None else min(stop, self.total)
+        offset = 0
+
+        for slots, count in zip(self.grammar.slots, self.counts):
+            if offset + count <= start:
+                offset += count
+                continue
+            if offset >= stop:
+                break
+
+            first = max(start, offset)
+            digits = _to_digits(first - offset, [self._size(slot, 1) for slot in slots])
+            words = self._iter_parts(slots, 0, digits)
+
+            for current, word in zip(range(first, min(offset + count, stop)), words):
+                if not (self.grammar.banned_pattern and self.grammar.banned_pattern.search(word)):
+                    yield current, word
+
+            offset += count
+
+    def _size(self, category, depth):
+        # Number of sounds a category expands to at this depth; like the
+        # sampler, derivations that go deeper than max_depth are rejected.
+        key = (category, depth)
+        if key not in self._sizes:
+            size = 0
+            for option in category.options:
+                if isinstance(option, str):
+                    size += 1
+                elif depth <= self.max_depth:
+                    size += _product(
+                        self._size(part, depth + 1) if isinstance(part, Category) else 1
+                        for part in option
+                    )
+            self._sizes[key] = size
+        return self._sizes[key]
+
+    def _iter_sounds(self, category, depth, start=0):
+        # The sounds of a category at this depth from the start-th on, in
+        # the order of its options and then of the sounds of their parts.
+        # Nested categories are walked rather than listed, so a recursive
+        # category costs memory in proportion to its depth only; the small
+        # ones are listed once, which walks them faster.
+        if not category.nested:
+            yield from itertools.islice(category.options, start, None)
+            return
+
+        key = (category, depth)
+        if key not in self._sounds and self._size(category, depth) <= MAX_LISTED_SOUNDS:
+            self._sounds[key] = list(self._walk_sounds(category, depth, 0))
+        if key in self._sounds:
+            yield from itertools.islice(self._sounds[key], start, None)
+        else:
+            yield from self._walk_sounds(category, depth, start)
+
+    def _walk_sounds(self, category, depth, start):
+        for option, size, part_sizes in self._options_of(category, depth):
+            if start >= size:
+                start -= size
+                continue
+            if part_sizes is None:
+                yield option
+            else:
+                yield from self._iter_parts(option, depth, _to_digits(start, part_sizes))
+            start = 0
+
+    def _iter_parts(self, parts, depth, digits):
+        # Concatenations of the sounds of parts, an odometer starting at
+        # digits whose last part turns fastest.
+        if not parts:
+            yield ""
+            return
+
+        first = parts[0]
+        if isinstance(first, Category):
+            heads = self._iter_sounds(first, depth + 1, digits[0])
+        else:
+            heads = (first,)
+
+        rest_digits = digits[1:]
+        for head in heads:
+            for tail in self._iter_parts(parts[1:], depth, rest_digits):
+                yield head + tail
+            rest_digits = [0] * len(rest_digits)
+
+    def _options_of(self, category, depth):
+        # (option, number of sounds, sizes of its parts) of the options that
+        # are allowed at this depth; part sizes are None for plain sounds.
+        key = (category, depth)
+        if key not in self._options:
+            options = []
+            for option in category.options:
+                if isinstance(option, str):
+                    options.append((option, 1, None))
+                elif depth <= self.max_depth:
+                    part_sizes = [
+                        self._size(part, depth + 1) if isinstance(part, Category) else 1
+                        for part in option
+                    ]
+                    options.append((option, _product(part_sizes), part_sizes))
+            self._options[key] = options
+        return self._options[key]
+
+
+def _product(numbers):
+    result = 1
+    for number in numbers:
+        result *= number
+    return result
+
+
+def _to_digits(number, sizes):
+    digits = [0] * len(sizes)
+
+    for position in range(len(sizes) - 1, -1, -1):
+        number, digits[position] = divmod(number, sizes[position])
+
+    return digits
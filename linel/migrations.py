@@ -0,0 +1,264 @@
+import time
+
+# The schema of a lexicon is versioned with PRAGMA user_version: a file at
+# version N has had the first N steps of MIGRATIONS applied. Steps run in
+# order when a database is opened, each in a transaction of its own that
+# also bumps the version, so an interrupted upgrade resumes where it
+# stopped. Only ever append steps; a released step must not change, which
+# is why they spell out their columns instead of using database.py's.
+
+
+def create_words(db):
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS words(
+            id INTEGER PRIMARY KEY,
+            word TEXT,
+            type TEXT,
+            english TEXT,
+            class_decl TEXT,
+            root TEXT,
+            notes TEXT
+        );
+    """)
+
+
+def index_columns(db):
+    for column in ("word", "type", "class_decl", "root"):
+        db.execute(f"CREATE INDEX IF NOT EXISTS idx_words_{column} ON words({column});")
+
+
+def add_full_text_search(db):
+    # Lexicons opened before versioning may already have the table.
+    if db.execute("SELECT 1 FROM sqlite_master WHERE name = 'words_fts';").fetchone():
+        return
+
+    db.execute("""
+        CREATE VIRTUAL TABLE words_fts USING fts5(
+            word, english, notes,
+            content='words', content_rowid='id', tokenize='trigram'
+        );
+    """)
+    db.execute("""
+        CREATE TRIGGER IF NOT EXISTS words_fts_insert AFTER INSERT ON words BEGIN
+            INSERT INTO words_fts(rowid, word, english, notes)
+            VALUES (new.id, new.word, new.english, new.notes);
+        END;
+    """)
+    db.execute("""
+        CREATE TRIGGER IF NOT EXISTS words_fts_delete AFTER DELETE ON words BEGIN
+            INSERT INTO words_fts(words_fts, rowid, word, english, notes)
+            VALUES ('delete', old.id, old.word, old.english, old.notes);
+        END;
+    """)
+    db.execute("""
+        CREATE TRIGGER IF NOT EXISTS words_fts_update AFTER UPDATE ON words BEGIN
+            INSERT INTO words_fts(words_fts, rowid, word, english, notes)
+            VALUES ('delete', old.id, old.word, old.english, old.notes);
+            INSERT INTO words_fts(rowid, word, english, notes)
+            VALUES (new.id, new.word, new.english, new.notes);
+        END;
+    """)
+    db.execute("INSERT INTO words_fts(words_fts) VALUES ('rebuild');")
+
+
+def add_similarity_index(db):
+    # Padded trigrams of every word and root, for fuzzy search. Triggers
+    # cannot use CTEs, so the grams are cut by joining with a table of
+    # positions; words of up to 254 characters are fully indexed.
+    db.execute("CREATE TABLE gram_positions(n INTEGER PRIMARY KEY);")
+    db.executemany("INSERT INTO gram_positions VALUES (?);", [(n,) for n in range(1, 257)])
+    db.execute("""
+        CREATE TABLE word_grams(
+            field TEXT NOT NULL,
+            gram TEXT NOT NULL,
+            word_id INTEGER NOT NULL,
+            PRIMARY KEY (field, gram, word_id)
+        ) WITHOUT ROWID;
+    """)
+
+    def grams_of(row, field, tables="gram_positions"):
+        return f"""
+            SELECT '{field}', substr('  ' || {row}.{field} || '  ', n, 3), {row}.id
+            FROM {tables} WHERE n <= length({row}.{field}) + 2 AND {row}.{field} != ''
+        """
+
+    def delete_grams(field):
+        # Deletes through the primary key rather than an index on word_id.
+        return f"""
+            DELETE FROM word_grams WHERE field = '{field}' AND word_id = old.id AND gram IN (
+                SELECT substr('  ' || old.{field} || '  ', n, 3)
+                FROM gram_positions WHERE n <= length(old.{field}) + 2
+            );
+        """
+
+    # While a row is in word_grams_deferred, e.g. during a bulk import,
+    # new words are left to the writer to index in one pass.
+    db.execute("CREATE TABLE word_grams_deferred(deferred INTEGER);")
+
+    # A gram repeated within a word is only stored once.
+    for field in ("word", "root"):
+        db.execute(f"INSERT OR IGNORE INTO word_grams {grams_of('words', field, 'words, gram_positions')};")
+
+    db.execute(f"""
+        CREATE TRIGGER word_grams_insert AFTER INSERT ON words
+        WHEN NOT EXISTS (SELECT 1 FROM word_grams_deferred) BEGIN
+            INSERT OR IGNORE INTO word_grams {grams_of('new', 'word')};
+            INSERT OR IGNORE INTO word_grams {grams_of('new', 'root')};
+        END;
+    """)
+    db.execute(f"""
+        CREATE TRIGGER word_grams_delete AFTER DELETE ON words BEGIN
+            {delete_grams('word')}
+            {delete_grams('root')}
+        END;
+    """)
+    db.execute(f"""
+        CREATE TRIGGER word_grams_update AFTER UPDATE OF word, root ON words BEGIN
+            {delete_grams('word')}
+            {delete_grams('root')}
+            INSERT OR IGNORE INTO word_grams {grams_of('new', 'word')};
+            INSERT OR IGNORE INTO word_grams {grams_of('new', 'root')};
+        END;
+    """)
+
+
+def add_paradigms(db):
+    # User-defined paradigm rules and the inflected forms they produce,
+    # indexed by form so that any form is found with one lookup. A form is
+    # prefix || base minus its last strip letters || suffix, where base is
+    # the word or root column; class_decl '*' matches every class.
+    db.execute("""
+        CREATE TABLE paradigm_rules(
+            id INTEGER PRIMARY KEY,
+            type TEXT NOT NULL,
+            class_decl TEXT NOT NULL,
+            name TEXT NOT NULL,
+            prefix TEXT NOT NULL DEFAULT '',
+            base TEXT NOT NULL CHECK (base IN ('word', 'root')),
+            strip INTEGER NOT NULL DEFAULT 0,
+            suffix TEXT NOT NULL DEFAULT ''
+        );
+    """)
+    db.execute("CREATE INDEX idx_paradigm_rules_type ON paradigm_rules(type, class_decl);")
+    db.execute("""
+        CREATE TABLE word_forms(
+            word_id INTEGER NOT NULL,
+            rule_id INTEGER NOT NULL,
+            form TEXT NOT NULL,
+            PRIMARY KEY (word_id, rule_id)
+        ) WITHOUT ROWID;
+    """)
+    db.execute("CREATE INDEX idx_word_forms_form ON word_forms(form);")
+
+    def forms_of(word, rule, table):
+        # Inserts the forms of the word rows made by the rule rows, one of
+        # them being a trigger's new row and the other the table.
+        stem = f"CASE {rule}.base WHEN 'root' THEN {word}.root ELSE {word}.word END"
+        return f"""
+            INSERT INTO word_forms
+            SELECT {word}.id, {rule}.id,
+                   {rule}.prefix || substr({stem}, 1, max(0, length({stem}) - {rule}.strip)) || {rule}.suffix
+            FROM {table}
+            WHERE {rule}.type = {word}.type
+              AND {rule}.class_decl IN (coalesce({word}.class_decl, ''), '*')
+              AND coalesce({stem}, '') != '';
+        """
+
+    # Bulk imports defer the forms like the trigrams, see add_similarity_index.
+    db.execute(f"""
+        CREATE TRIGGER word_forms_insert AFTER INSERT ON words
+        WHEN NOT EXISTS (SELECT 1 FROM word_grams_deferred) BEGIN
+            {forms_of('new', 'paradigm_rules', 'paradigm_rules')}
+        END;
+    """)
+    db.execute("""
+        CREATE TRIGGER word_forms_delete AFTER DELETE ON words BEGIN
+            DELETE FROM word_forms WHERE word_id = old.id;
+        END;
+    """)
+    db.execute(f"""
+        CREATE TRIGGER word_forms_update AFTER UPDATE OF word, type, class_decl, root ON words BEGIN
+            DELETE FROM word_forms WHERE word_id = old.id;
+            {forms_of('new', 'paradigm_rules', 'paradigm_rules')}
+        END;
+    """)
+
+    # Changing a rule only touches the words of its type. Forms are not
+    # indexed by rule, so deleting rules scans word_forms; rules change
+    # rarely, and Database.set_paradigm_rules() clears the table first.
+    db.execute(f"""
+        CREATE TRIGGER paradigm_rules_insert AFTER INSERT ON paradigm_rules BEGIN
+            {forms_of('words', 'new', 'words')}
+        END;
+    """)
+    db.execute("""
+        CREATE TRIGGER paradigm_rules_delete AFTER DELETE ON paradigm_rules BEGIN
+            DELETE FROM word_forms WHERE rule_id = old.id;
+        END;
+    """)
+    db.execute(f"""
+        CREATE TRIGGER paradigm_rules_update AFTER UPDATE ON paradigm_rules BEGIN
+            DELETE FROM word_forms WHERE rule_id = old.id;
+            {forms_of('words', 'new', 'words')}
+        END;
+    """)
+
+
+MIGRATIONS = (
+    ("create the words table", create_words),
+    ("index the searched columns", index_columns),
+    ("add full-text search", add_full_text_search),
+    ("add the similarity index", add_similarity_index),
+    ("add paradigm rules and word forms", add_paradigms),
+)
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def schema_version(db):
+    return db.execute("PRAGMA user_version;").fetchone()[0]
+
+
+def migrate(db, name="database"):
+    # Returns the (version, description, seconds) of the steps applied.
+    version = schema_version(db)
+    if version > SCHEMA_VERSION:
+        raise ValueError(
+            f"{name} has schema version {version}, newer than this linel "
+            f"supports ({SCHEMA_VERSION})."
+        )
+
+    if version == SCHEMA_VERSION:
+        return []
+
+    # logging is only imported when there is something to report, it
+    # costs more at startup than the rest of linel.database.
+    import logging
+    log = logging.getLogger(__name__)
+
+    # Creating a new lexicon is not worth reporting, upgrading one is.
+    new = not version and not db.execute("SELECT 1 FROM sqlite_master;").fetchone()
+    level = logging.DEBUG if new else logging.INFO
+
+    applied = []
+    for version, (description, step) in enumerate(MIGRATIONS[version:], version + 1):
+        start = time.perf_counter()
+
+        # IMMEDIATE takes the write lock up front; another process may have
+        # applied the step while this one was waiting for it.
+        db.execute("BEGIN IMMEDIATE;")
+        try:
+            if schema_version(db) >= version:
+                db.rollback()
+                continue
+            step(db)
+            db.execute(f"PRAGMA user_version = {version};")
+        except BaseException:
+            db.rollback()
+            raise
+        db.commit()
+
+        elapsed = time.perf_counter() - start
+        log.log(level, "%s: migrated to version %d, %s (%.3fs)", name, version, description, elapsed)
+        applied.append((version, description, elapsed))
+
+    return applied
@@ -0,0 +1,61 @@
+import re
+
+# Paradigm rules build the inflected forms of a word from its word or root
+# column. A rules file has one rule per line, "type class form rule":
+#
+#     Noun  1  genitive    root+i
+#     Noun  1  plural      word-1+e     # drop the last letter, add "e"
+#     Verb  *  negative    na+word      # "*" matches any class
+#
+# A rule is [prefix+](word|root)[-N][+suffix]. Rules are stored in the
+# paradigm_rules table of each lexicon, and the forms they produce in
+# word_forms, which triggers keep up to date as words and rules change; see
+# the add_paradigms migration.
+
+PARADIGM_COLUMNS = ("type", "class_decl", "name", "prefix", "base", "strip", "suffix")
+
+RULE_PATTERN = re.compile(r"(?:([^\s+-]+)\+)?(word|root)(?:-(\d+))?(?:\+([^\s+-]+))?")
+
+
+def parse_rule(text):
+    # "word-1+e" -> ("", "word", 1, "e")
+    match = RULE_PATTERN.fullmatch(text)
+    if not match:
+        raise ValueError(f"Invalid paradigm rule: {text!r}")
+
+    prefix, base, strip, suffix = match.groups()
+    return prefix or "", base, int(strip or 0), suffix or ""
+
+
+def parse_rules(text):
+    # Returns rows in PARADIGM_COLUMNS order.
+    rules = []
+
+    for number, line in enumerate(text.splitlines(), 1):
+        line = line.partition("#")[0].strip()
+        if not line:
+            continue
+
+        fields = line.split()
+        if len(fields) != 4:
+            raise ValueError(f"Line {number}: expected 'type class form rule', got {line!r}")
+
+        type, class_decl, name, rule = fields
+        try:
+            rules.append((type, class_decl, name, *parse_rule(rule)))
+        except ValueError as error:
+            raise ValueError(f"Line {number}: {error}") from None
+
+    return rules
+
+
+def format_rule(rule):
+    type, class_decl, name, prefix, base, strip, suffix = rule
+    text = base
+    if prefix:
+        text = f"{prefix}+{text}"
+    if strip:
+        text += f"-{strip}"
+    if suffix:
+        text += f"+{suffix}"
+    return f"{type}\t{class_decl}\t{name}\t{text}"
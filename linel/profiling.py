@@ -0,0 +1,187 @@
+import atexit
+import collections
+import json
+import os
+import pathlib
+import time
+from contextlib import contextmanager, nullcontext
+
+# Opt-in timings of queries, screens and the generator, kept in a ring
+# buffer of the most recent records. Enable it with
+#
+#     LINEL_PROFILE=1 python -m linel
+#     LINEL_PROFILE=profile.json python -m linel    # also dumped at exit
+#     python -m linel --profile=profile.json query lexicon.db --word kesi
+#
+# and press F12 in the TUI for the latencies. When disabled, timed() hands
+# out a shared no-op context and the database checks a single flag.
+
+ENV_VAR = "LINEL_PROFILE"
+BUFFER_SIZE = 10000
+MAX_NAME_LENGTH = 200
+
+_NO_TIMING = nullcontext()
+
+
+def percentile(values, fraction):
+    # Nearest-rank percentile of sorted values.
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+class Profiler:
+    def __init__(self, size=BUFFER_SIZE):
+        self.enabled = False
+        self.records = collections.deque(maxlen=size)
+        self.dump_path = None
+
+    def enable(self, dump_path=None):
+        self.enabled = True
+        if dump_path and not self.dump_path:
+            self.dump_path = pathlib.Path(dump_path)
+            atexit.register(lambda: self.dump(self.dump_path))
+
+    def disable(self):
+        self.enabled = False
+
+    def clear(self):
+        self.records.clear()
+
+    def record(self, kind, name, elapsed, rows=None):
+        # elapsed is in seconds; deque.append is safe from any thread.
+        name = " ".join(name.split())[:MAX_NAME_LENGTH]
+        self.records.append({
+            "kind": kind,
+            "name": name,
+            "ms": round(elapsed * 1000, 3),
+            "rows": rows,
+            "at": time.time(),
+        })
+
+    def timed(self, kind, name):
+        if not self.enabled:
+            return _NO_TIMING
+        return self._timed(kind, name)
+
+    @contextmanager
+    def _timed(self, kind, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(kind, name, time.perf_counter() - start)
+
+    def cursor(self, kind, name, execute, *args):
+        # Runs execute(*args) and times the cursor it returns through the
+        # fetching of its rows; see TimedCursor.
+        return TimedCursor(self, kind, name, execute, *args)
+
+    def stats(self):
+        # (kind, name) -> count, p50, p95 and max in milliseconds, the
+        # slowest first.
+        timings = collections.defaultdict(list)
+        for record in list(self.records):
+            timings[record["kind"], record["name"]].append(record["ms"])
+
+        stats = []
+        for (kind, name), values in timings.items():
+            values.sort()
+            stats.append({
+                "kind": kind,
+                "name": name,
+                "count": len(values),
+                "p50_ms": percentile(values, 0.5),
+                "p95_ms": percentile(values, 0.95),
+                "max_ms": values[-1],
+            })
+        stats.sort(key=lambda stat: stat["p95_ms"], reverse=True)
+        return stats
+
+    def slowest(self, kind=None, count=20):
+        records = [record for record in list(self.records) if kind in (None, record["kind"])]
+        return sorted(records, key=lambda record: record["ms"], reverse=True)[:count]
+
+    def dump(self, path):
+        data = {"stats": self.stats(), "records": list(self.records)}
+        pathlib.Path(path).write_text(json.dumps(data, indent=2))
+        return path
+
+
+class TimedCursor:
+    # A cursor whose timing runs from execute() to the last row fetched,
+    # with the number of rows, since most of the time of a read is spent
+    # fetching. It is recorded when the rows run out, or when the cursor is
+    # dropped before that, e.g. after fetchone() or a cancelled search.
+
+    def __init__(self, profiler, kind, name, execute, *args):
+        self._profiler = profiler
+        self._kind = kind
+        self._name = name
+        self._rows = 0
+        # A failed execute() is not recorded.
+        self._recorded = True
+        self._start = time.perf_counter()
+        self._cursor = execute(*args)
+        self._last = time.perf_counter()
+        self._recorded = False
+
+    @property
+    def row_factory(self):
+        return self._cursor.row_factory
+
+    @row_factory.setter
+    def row_factory(self, row_factory):
+        self._cursor.row_factory = row_factory
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            row = next(self._cursor)
+        except StopIteration:
+            self._fetched(0, done=True)
+            raise
+        self._fetched(1)
+        return row
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        self._fetched(row is not None, done=row is None)
+        return row
+
+    def fetchmany(self, size=None):
+        size = self._cursor.arraysize if size is None else size
+        rows = self._cursor.fetchmany(size)
+        self._fetched(len(rows), done=len(rows) < size)
+        return rows
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        self._fetched(len(rows), done=True)
+        return rows
+
+    def __del__(self):
+        self._record()
+
+    def _fetched(self, rows, done=False):
+        self._rows += rows
+        self._last = time.perf_counter()
+        if done:
+            self._record()
+
+    def _record(self):
+        if not self._recorded:
+            self._recorded = True
+            self._profiler.record(self._kind, self._name, self._last - self._start, self._rows)
+
+
+profiler = Profiler()
+
+if os.environ.get(ENV_VAR):
+    value = os.environ[ENV_VAR]
+    profiler.enable(dump_path=value if value.endswith(".json") else None)
@@ -0,0 +1,100 @@
+import os
+
+from textual import work
+from textual.app import on
+from textual.screen import Screen
+from textual.widgets import Button, Checkbox, Input, Label, ProgressBar, Select
+
+from linel.catalog import database_dir
+from linel.database import ImportCancelled
+
+class CSVSelectionScreen(Screen):
+
+    def __init__(self, db):
+        super().__init__()
+        self.db = db
+        self.cancelled = False
+
+    def compose(self):
+
+        csv_dir = database_dir()
+        csv_files = [
+            f for f in os.listdir(csv_dir)
+            if f.endswith(".csv") and not f.endswith(".errors.csv")
+        ]
+
+        if not csv_files:
+            yield Label("No CSV found in the 'database' folder.")
+            yield Button("Cancel", id="cancel")
+        else:
+            yield Label("Select a csv to load:")
+            self.selection = Select.from_values(csv_files)
+            yield self.selection
+
+            self.upsert = Checkbox("Update existing words", id="upsert")
+            yield self.upsert
+            self.upsert_key = Input("word,type", placeholder="Columns matching a word", id="upsert-key")
+            yield self.upsert_key
+
+            self.progress = ProgressBar(show_eta=True, id="progress")
+            yield self.progress
+            self.status = Label("", id="status")
+            yield self.status
+
+            yield Button("Load", id="load")
+            yield Button("Stop", variant="warning", id="stop", disabled=True)
+            yield Button("Cancel", id="back")     
+
+    @on(Button.Pressed, "#load")
+    def action_load(self):
+        selected_csv = self.selection.value
+    
+        if not selected_csv == Select.BLANK:
+            self.cancelled = False
+            self.query_one("#load", Button).disabled = True
+            self.query_one("#stop", Button).disabled = False
+            upsert_key = self.upsert_key.value if self.upsert.value else None
+            self.import_csv(database_dir() / selected_csv, upsert_key)
+        else:
+            print("No CSV selected")
+
+    @on(Button.Pressed, "#stop")
+    def action_stop(self):
+        self.cancelled = True
+
+    def on_unmount(self):
+        self.cancelled = True
+
+    @work(exclusive=True, group="import")
+    async def import_csv(self, csv_path, upsert_key=None):
+        # Runs on the database thread; progress is reported after every
+        # chunk and returning False there rolls the import back.
+        def progress(report):
+            self.app.call_from_thread(self.show_progress, report)
+            return not self.cancelled
+
+        try:
+            report = await self.db.import_csv(csv_path, progress=progress, upsert_key=upsert_key)
+        except ImportCancelled:
+            self.notify("Import stopped, no words were imported.")
+        except (OSError, ValueError) as error:
+            self.notify(str(error), severity="error")
+        else:
+            self.app.notify(
+                f"Imported {report.inserted} words ({report.rows_per_sec:.0f} rows/sec), "
+                f"updated {report.updated}, unchanged {report.unchanged}, skipped {report.skipped}."
+            )
+            if report.error_path:
+                self.app.notify(f"Skipped rows were written to {report.error_path.name}.")
+            self.app.switch_to_home()
+            return
+
+        self.query_one("#load", Button).disabled = False
+        self.query_one("#stop", Button).disabled = True
+
+    def show_progress(self, report):
+        self.progress.update(total=report.size, progress=report.position)
+        self.status.update(
+            f"{report.inserted} words imported, {report.updated} updated, {report.skipped} skipped "
+            f"({report.rows_per_sec:.0f} rows/sec)"
+        )
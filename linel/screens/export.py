@@ -0,0 +1,73 @@
+import pathlib
+import sqlite3
+
+from textual.app import on
+from textual.screen import Screen
+from textual.widgets import Button, Header, Input, Label, ProgressBar, Select
+
+from linel.catalog import database_dir
+from linel.database import EXPORT_FORMATS
+
+EXTENSIONS = {"csv": ".csv", "jsonl": ".jsonl", "sqlite": ".db"}
+
+class ExportScreen(Screen):
+
+    def __init__(self, db):
+        super().__init__()
+        self.db = db
+
+    def compose(self):
+        yield Header()
+        yield Label("Export format:")
+        self.format_input = Select.from_values(
+            EXPORT_FORMATS,
+            value="csv",
+            allow_blank=False,
+            id="format",
+        )
+        yield self.format_input
+
+        yield Label("File name (saved in the 'database' folder):")
+        self.name_input = Input(
+            value=pathlib.Path(self.db.db_path).stem + "-export",
+            placeholder="File name",
+            id="name",
+        )
+        yield self.name_input
+
+        self.progress = ProgressBar(id="progress")
+        yield self.progress
+
+        yield Button("Export", id="export")
+        yield Button("Cancel", id="back")
+
+    @on(Button.Pressed, "#export")
+    async def action_export(self, event):
+        format = self.format_input.value
+        name = self.name_input.value.strip()
+
+        if not name:
+            self.notify("Insert a name for the export.", severity="error")
+            return
+
+        path = database_dir() / name
+        if not path.suffix:
+            path = path.with_suffix(EXTENSIONS[format])
+
+        if path.exists():
+            self.notify(f"{path.name} already exists.", severity="error")
+            return
+
+        # Called from the database thread after every chunk.
+        def report(done, total):
+            self.app.call_from_thread(self.progress.update, total=total, progress=done)
+
+        event.button.disabled = True
+        try:
+            await self.db.export_file(path, format, progress=report)
+        except (OSError, sqlite3.Error) as error:
+            self.notify(str(error), severity="error")
+        else:
+            self.notify(f"Exported to {path.name}.")
+        finally:
+            event.button.disabled = False
@@ -0,0 +1,144 @@
+from textual import work
+from textual.app import on, ComposeResult
+from textual.screen import Screen
+from textual.widgets import Button, Checkbox, Footer, Header, Input, Label, Select, TextArea
+from textual.worker import get_current_worker
+
+from linel.generator import WordEnumerator, WordGenerator, load_default_patterns
+
+class WordGeneratorScreen(Screen):
+
+    # Rounds of replacing the words skipped as too close to the lexicon.
+    SCREEN_ROUNDS = 5
+
+    def __init__(self):
+        super().__init__()
+        self.generator = None
+        self.default_sounds, self.default_syllables = load_default_patterns()
+    
+    def compose(self) -> ComposeResult:
+        yield Header()
+        yield Label("Number of Words to Generate:")
+        self.num_input = Input(placeholder="Enter a number", id="num_input")
+        yield self.num_input
+
+        yield Label("Phonological Categories (sounds.txt):")
+        self.sounds_input = TextArea(text=self.default_sounds, id="sounds_input")
+        yield self.sounds_input
+
+        yield Label("Syllable Structures (syllables.txt):")
+        self.syllables_input = TextArea(text=self.default_syllables, id="syllables_input")
+        yield self.syllables_input
+
+        self.mode_input = Select.from_values(
+            ("random", "enumerate"),
+            value="random",
+            allow_blank=False,
+            id="mode",
+        )
+        yield self.mode_input
+
+        self.unique_input = Checkbox("Only words not in the lexicon", id="unique")
+        yield self.unique_input
+
+        self.distinct_input = Checkbox("Skip words one edit away from the lexicon", id="distinct")
+        yield self.distinct_input
+
+        self.offset_input = Input(placeholder="Start offset (enumerate)", id="offset_input")
+        yield self.offset_input
+
+        yield Button("Generate Words", id="generate")
+
+        self.output = TextArea(read_only=True, id="output")
+        yield Label("Generated Words:")
+        self.counts_label = Label("", id="counts")
+        yield self.counts_label
+        yield self.output
+
+        yield Footer()
+
+    def load_patterns(self):
+        # Compiled grammars are cached, so this only parses changed text.
+        self.generator = WordGenerator(self.sounds_input.text, self.syllables_input.text)
+
+    async def generate_words(self):
+        num_words = int(self.num_input.value or 10)
+
+        if self.unique_input.value:
+            existing = await self.app.db.get_word_set() if self.app.db else ()
+            words = self.generator.generate(num_words, unique=True, exclude=existing)
+        else:
+            words = self.generator.generate(num_words)
+
+        if self.distinct_input.value and self.app.db:
+            words = await self.screen_words(words, num_words)
+        self.output.text = "\n".join(words)
+
+    async def screen_words(self, words, num_words):
+        # Near-duplicates of the lexicon are dropped and replaced by new
+        # words, which are screened in turn.
+        kept = []
+        skipped = 0
+
+        for _ in range(self.SCREEN_ROUNDS):
+            close = await self.app.db.near_duplicates(words)
+            skipped += len(close)
+            kept += [word for word in words if word not in close]
+            if len(kept) >= num_words or not words:
+                break
+            words = self.generator.generate(num_words - len(kept), unique=self.unique_input.value, exclude=kept)
+
+        self.counts_label.update(f"Skipped {skipped} words close to the lexicon.")
+        return kept
+
+    @work(exclusive=True, thread=True, group="enumerate")
+    def enumerate_words(self, sounds, syllables, num_words, start):
+        # Large grammars take a while to count, so this runs off the event
+        # loop; pressing Generate again cancels the previous run.
+        worker = get_current_worker()
+        found = []
+
+        try:
+            enumerator = WordEnumerator(sounds, syllables)
+            for item in enumerator.iter_words(start):
+                if worker.is_cancelled or len(found) >= num_words:
+                    break
+                found.append(item)
+        except ValueError as error:
+            self.app.call_from_thread(self.output.load_text, str(error))
+            return
+
+        if not worker.is_cancelled:
+            self.app.call_from_thread(self.show_enumeration, enumerator, found)
+
+    def show_enumeration(self, enumerator, found):
+        counts = ", ".join(f"{structure}: {count}" for structure, count in enumerator.structure_counts())
+        self.counts_label.update(f"{enumerator.total} possible words ({counts})")
+        self.output.text = "\n".join(word for _, word in found)
+
+        # Leave the offset on the next page so pressing again continues.
+        if found:
+            self.offset_input.value = str(found[-1][0] + 1)
+
+    def gen_word(self):
+        return self.generator.generate(1)[0]
+
+    @on(Button.Pressed, "#generate")
+    async def action_generate(self):
+        if self.sounds_input.text and self.syllables_input.text:
+            try:
+                if self.mode_input.value == "enumerate":
+                    self.enumerate_words(
+                        self.sounds_input.text,
+                        self.syllables_input.text,
+                        int(self.num_input.value or 10),
+                        int(self.offset_input.value or 0),
+                    )
+                    return
+                self.load_patterns()
+            except ValueError as error:
+                self.output.text = str(error)
+                return
+            await self.generate_words()
+        else:
+            self.output.text = "Please provide content for both sounds and syllables."
@@ -0,0 +1,82 @@
+import time
+
+from textual.app import on
+from textual.screen import Screen
+from textual.widgets import Button, DataTable, Footer, Header, Label
+
+from linel.catalog import database_dir
+from linel.profiling import ENV_VAR, profiler
+
+class ProfileScreen(Screen):
+
+    BINDINGS = [("escape", "close", "Close"),
+                ("r", "refresh_stats", "Refresh")]
+
+    SLOWEST = 20
+
+    def compose(self):
+        yield Header()
+
+        if profiler.enabled:
+            yield Label(f"{len(profiler.records)} timings recorded.", id="profile-status")
+        else:
+            yield Label(
+                f"Profiling is off; start linel with {ENV_VAR}=1 or --profile.",
+                id="profile-status",
+            )
+
+        yield Label("Latencies (ms):")
+        self.stats_list = DataTable(classes="Words-list")
+        self.stats_list.add_columns("Kind", "Name", "Count", "p50", "p95", "Max")
+        self.stats_list.cursor_type = "row"
+        self.stats_list.zebra_stripes = True
+        yield self.stats_list
+
+        yield Label(f"Slowest {self.SLOWEST} queries (ms):")
+        self.slowest_list = DataTable(classes="Words-list")
+        self.slowest_list.add_columns("Name", "Time", "Rows")
+        self.slowest_list.cursor_type = "row"
+        self.slowest_list.zebra_stripes = True
+        yield self.slowest_list
+
+        yield Button("Dump to JSON", variant="success", id="dump")
+        yield Button("Clear", variant="warning", id="clear")
+        yield Button("Close", id="close")
+        yield Footer()
+
+    def on_mount(self):
+        self.action_refresh_stats()
+
+    def action_refresh_stats(self):
+        self.stats_list.clear()
+        for stat in profiler.stats():
+            self.stats_list.add_row(
+                stat["kind"], stat["name"], stat["count"],
+                stat["p50_ms"], stat["p95_ms"], stat["max_ms"],
+            )
+
+        self.slowest_list.clear()
+        for record in profiler.slowest("query", self.SLOWEST):
+            self.slowest_list.add_row(record["name"], record["ms"], record["rows"] if record["rows"] is not None else "")
+
+        if profiler.enabled:
+            self.query_one("#profile-status", Label).update(f"{len(profiler.records)} timings recorded.")
+
+    @on(Button.Pressed, "#dump")
+    def action_dump(self):
+        path = database_dir() / time.strftime("profile-%Y%m%d-%H%M%S.json")
+        try:
+            profiler.dump(path)
+        except OSError as error:
+            self.notify(str(error), severity="error")
+        else:
+            self.notify(f"Timings written to {path.name}.")
+
+    @on(Button.Pressed, "#clear")
+    def action_clear(self):
+        profiler.clear()
+        self.action_refresh_stats()
+
+    @on(Button.Pressed, "#close")
+    def action_close(self):
+        self.app.pop_screen()
@@ -0,0 +1,229 @@
+import sqlite3
+
+from textual import work
+from textual.app import on
+from textual.containers import Grid, Horizontal
+from textual.screen import Screen
+from textual.widgets import Button, Checkbox, DataTable, Footer, Header, Input, Label, Select
+from textual.worker import get_current_worker
+
+from linel.catalog import database_dir
+from linel.database import FUZZY_DISTANCE, SEARCH_MODES
+from linel.federated import FederatedSearch, lexicon_paths
+
+class QueryScreen(Screen):
+
+    # Seconds to wait after the last keystroke before searching, and number
+    # of rows added to the table per batch.
+    SEARCH_DELAY = 0.3
+    CHUNK_SIZE = 200
+
+    # Edit distances offered for fuzzy searches.
+    DISTANCES = (1, 2, 3)
+
+    COLUMNS = ("ID", "Word", "Type", "English", "Class/Declinations", "Root", "Notes")
+
+    def __init__(self, db):
+        super().__init__()
+        self.db = db
+        self.search_timer = None
+        self.search_generation = 0
+        self.search_connection = None
+        self.federated_search = None
+
+    def compose(self):
+        yield Header()
+        yield Grid(
+            Label("Search", id="title"),
+            Label("Word:", classes="label"),
+            Input(
+                value=None,
+                placeholder="Word",
+                classes="input",
+                id="input-word",
+            ),
+            Label("Type:", classes="label"),
+            Input(
+                value=None,
+                placeholder="Type",
+                classes="input",
+                id="input-type",
+            ),
+            Label("English:", classes="label"),
+            Input(
+                value=None,
+                placeholder="English",
+                classes="input",
+                id="input-english",
+            ),
+            Label("Class/Declination:", classes="label"),
+            Input(
+                value=None,
+                placeholder="Class/Declination",
+                classes="input",
+                id="input-class_decl",
+            ),
+            Label("Root:", classes="label"),
+            Input(
+                value=None,
+                placeholder="Root",
+                classes="input",
+                id="input-root",
+            ),
+            Label("Mode:", classes="label"),
+            Select.from_values(
+                SEARCH_MODES,
+                value="exact",
+                allow_blank=False,
+                id="input-mode",
+            ),
+            Select(
+                [(f"Within {distance} edit{'s' if distance > 1 else ''}", distance) for distance in self.DISTANCES],
+                value=FUZZY_DISTANCE,
+                allow_blank=False,
+                disabled=True,
+                id="input-distance",
+            ),
+            Checkbox("All lexicons", id="input-all"),
+            Button("Search", variant="success", id="search"),
+            Button("Cancel", variant="warning", id="back"),
+            id="input-dialog",
+        )
+
+        self.linel_list = DataTable(classes="Words-list")
+        self.linel_list.focus()
+        self.linel_list.add_columns(*self.COLUMNS)
+        self.linel_list.cursor_type = "row"
+        self.linel_list.zebra_stripes = True
+
+        yield Horizontal(self.linel_list)
+
+        yield Footer()
+
+        
+    @on(Select.Changed, "#input-mode")
+    def toggle_distance(self, event):
+        self.query_one("#input-distance", Select).disabled = event.value != "fuzzy"
+
+    @on(Checkbox.Changed, "#input-all")
+    def toggle_sources(self, event):
+        # Searches of every lexicon show where each word comes from.
+        columns = ("Source", *self.COLUMNS) if event.value else self.COLUMNS
+        self.cancel_search()
+        self.linel_list.clear(columns=True)
+        self.linel_list.add_columns(*columns)
+
+    @on(Input.Changed)
+    @on(Select.Changed, "#input-mode")
+    @on(Select.Changed, "#input-distance")
+    @on(Checkbox.Changed, "#input-all")
+    def schedule_search(self):
+        if self.search_timer:
+            self.search_timer.stop()
+            self.search_timer = None
+
+        # Searching as you type never lists the whole lexicon: with every
+        # field empty the table is cleared, and listing everything is left
+        # to the Search button.
+        if not any(self.search_criteria()[1:6]):
+            self.cancel_search()
+            self.linel_list.clear()
+            return
+        self.search_timer = self.set_timer(self.SEARCH_DELAY, self.action_search)
+
+    def search_criteria(self):
+        word = self.query_one("#input-word", Input).value
+        type = self.query_one("#input-type", Input).value
+        english = self.query_one("#input-english", Input).value
+        class_decl = self.query_one("#input-class_decl", Input).value
+        root = self.query_one("#input-root", Input).value
+        mode = self.query_one("#input-mode", Select).value
+        distance = self.query_one("#input-distance", Select).value
+        return (mode, word, type, english, class_decl, root, distance)
+
+    @on(Button.Pressed, "#search")
+    def action_search(self):
+        if self.search_timer:
+            self.search_timer.stop()
+            self.search_timer = None
+        words_list = self.query_one(DataTable)
+        words_list.clear()
+        search = self.search_criteria()
+
+        self.cancel_search()
+        if self.query_one("#input-all", Checkbox).value:
+            self.search_lexicons(self.search_generation, search)
+        else:
+            self.search_words(self.search_generation, *search)
+
+    def cancel_search(self):
+        self.search_generation += 1
+
+        # Stop the query of the previous search straight away rather than
+        # waiting for its worker to notice the cancellation.
+        connection = self.search_connection
+        if connection:
+            try:
+                connection.interrupt()
+            except sqlite3.ProgrammingError:
+                pass
+        if self.federated_search:
+            self.federated_search.cancel()
+
+    def on_unmount(self):
+        if self.search_timer:
+            self.search_timer.stop()
+        self.cancel_search()
+
+    @work(exclusive=True, thread=True, group="search")
+    def search_words(self, generation, mode, word, type, english, class_decl, root, distance):
+        worker = get_current_worker()
+
+        with self.db.reading() as connection:
+            if worker.is_cancelled:
+                return
+            self.search_connection = connection
+
+            try:
+                chunks = self.db.iter_search_words(
+                    mode, word, type, english, class_decl, root, distance,
+                    chunk_size=self.CHUNK_SIZE,
+                    connection=connection,
+                )
+                for words in chunks:
+                    if worker.is_cancelled:
+                        break
+                    self.app.call_from_thread(self.add_results, generation, words)
+            except sqlite3.OperationalError as error:
+                if not worker.is_cancelled:
+                    self.app.call_from_thread(self.notify, str(error), severity="error")
+            finally:
+                self.search_connection = None
+
+    @work(exclusive=True, thread=True, group="search")
+    def search_lexicons(self, generation, search):
+        worker = get_current_worker()
+        federated_search = FederatedSearch(lexicon_paths(database_dir()))
+        self.federated_search = federated_search
+
+        try:
+            for source, words in federated_search.run(*search, chunk_size=self.CHUNK_SIZE):
+                if worker.is_cancelled:
+                    break
+                self.app.call_from_thread(self.add_results, generation, words, source)
+        finally:
+            if self.federated_search is federated_search:
+                self.federated_search = None
+
+        for source, error in federated_search.errors:
+            self.app.call_from_thread(self.notify, f"{source}: {error}", severity="error")
+
+    def add_results(self, generation, words, source=None):
+        if generation != self.search_generation:
+            return
+
+        for word_data in words:
+            if source:
+                self.linel_list.add_row(source, *word_data)
+            else:
+                self.linel_list.add_row(*word_data)
@@ -1,5 +1,8 @@
-from linel.database import Database
-from textual.app import App, on, ComposeResult
+from linel.catalog import Catalog, database_dir
+from linel.profiling import profiler
+from textual import work
+from textual.app import App, on
+from textual.binding import Binding
 from textual.containers import Grid, Horizontal, Vertical
 from textual.screen import Screen
 from textual.widgets import (
@@ -10,21 +13,50 @@ from textual.widgets import (
     DataTable, 
     Static, 
     Input, 
-    Select, 
-    TextArea
+    Select
 )
-import pathlib, os, csv
-import random
+import time
+
+# QueryScreen, CSVSelectionScreen and WordGeneratorScreen live in
+# linel.screens and are imported the first time they are opened, and the
+# database modules once a lexicon is.
+
+def describe_entry(entry):
+    # Name, words, schema version, size and modification time of a catalog
+    # entry; the values that are not known yet are shown as "?".
+    if entry["error"]:
+        words = version = "error"
+    else:
+        words = "?" if entry["words"] is None else f"{entry['words']:,}"
+        version = "?" if entry["version"] is None else str(entry["version"])
+
+    size = "?" if entry["size"] is None else format_size(entry["size"])
+    if entry["mtime"] is None:
+        modified = "?"
+    else:
+        modified = time.strftime("%Y-%m-%d %H:%M", time.localtime(entry["mtime"]))
+    return entry["name"], words, version, size, modified
+
+def format_size(size):
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
 
 class DatabaseSelectionScreen(Screen):
 
     def __init__(self):
         super().__init__()
+        self.catalog = Catalog(database_dir())
+        self.selection = None
 
     def compose(self):
 
-        database_dir = pathlib.Path(__file__).parent / "database"
-        db_files = [f for f in os.listdir(database_dir) if f.endswith(".db")]
+        # Listed from the catalog cache; the files that changed since are
+        # read again in the background once the screen is shown.
+        db_files = [entry["name"] for entry in self.catalog.entries()]
+        self.db_files = db_files
 
         yield Header()
 
@@ -37,10 +69,45 @@ class DatabaseSelectionScreen(Screen):
             self.selection = Select.from_values(db_files)
             yield self.selection
 
+            self.catalog_list = DataTable(classes="Words-list")
+            self.catalog_list.add_columns("Name", "Words", "Schema", "Size", "Modified")
+            self.catalog_list.cursor_type = "row"
+            self.catalog_list.zebra_stripes = True
+            yield self.catalog_list
+
             yield Button("New", id="new")
             yield Button("Load", id="load")
         yield Button("Cancel", id="cancel")
 
+    def on_screen_resume(self):
+        if self.selection:
+            self.show_catalog()
+            self.refresh_catalog()
+
+    @work(exclusive=True, thread=True, group="catalog")
+    def refresh_catalog(self):
+        if self.catalog.refresh():
+            self.app.call_from_thread(self.show_catalog)
+
+    def show_catalog(self):
+        entries = self.catalog.entries()
+        names = [entry["name"] for entry in entries]
+
+        if names != self.db_files:
+            selected = self.selection.value
+            self.selection.set_options((name, name) for name in names)
+            if selected in names:
+                self.selection.value = selected
+            self.db_files = names
+
+        self.catalog_list.clear()
+        for entry in entries:
+            self.catalog_list.add_row(*describe_entry(entry), key=entry["name"])
+
+    @on(DataTable.RowSelected)
+    def select_row(self, event):
+        self.selection.value = event.row_key.value
+
     @on(Button.Pressed, "#new")
     def action_new(self):
         self.app.push_screen(NewDatabaseScreen())        
@@ -50,7 +117,7 @@ class DatabaseSelectionScreen(Screen):
         selected_db = self.selection.value
     
         if selected_db != Select.BLANK:
-            db_path = pathlib.Path(__file__).parent / "database" / selected_db
+            db_path = database_dir() / selected_db
             self.app.set_database(db_path)
             self.app.push_screen(Home())
         else:
@@ -83,7 +150,7 @@ class NewDatabaseScreen(Screen):
         name_db = self.query_one("#name", Input).value + ".db"
     
         if name_db:
-            db_path = pathlib.Path(__file__).parent / "database" / name_db
+            db_path = database_dir() / name_db
             self.app.set_database(db_path)
             self.app.push_screen(Home())
         else:
@@ -99,22 +166,32 @@ class Home(Screen):
                 ("u", "modify", "Update word"),
                 ("s", "search", "Search"),
                 ("c", "upload_csv", "Upload csv"),
-                ("d","delete", "Delete word")]
+                ("d","delete", "Delete word"),
+                ("x", "mark", "Mark row"),
+                ("e", "export", "Export")]
+
+    # Only a window of rows is kept in the table; pages are fetched by id
+    # as the cursor gets close to either edge of the window.
+    PAGE_SIZE = 100
+    WINDOW_SIZE = 300
 
     def __init__(self):
         super().__init__()
+        self.marked = set()
+        self.window = []
 
     def compose(self):
         yield Header()
         self.linel_list = DataTable(classes="Words-list")
         self.linel_list.focus()
-        self.linel_list.add_columns("ID","Word", "Type", "English", "Class/Declinations", "Root", "Notes")
+        self.columns = self.linel_list.add_columns("ID","Word", "Type", "English", "Class/Declinations", "Root", "Notes")
         self.linel_list.cursor_type = "row"
         self.linel_list.zebra_stripes = True
         add_button = Button("Add", variant="success", id="add")
         modify_button = Button("Update", variant="success", id="modify")
         search_button = Button("Search", variant="success", id="search")
         upload_csv_button = Button("Upload CSV", variant = "success", id = "upload_csv")
+        export_button = Button("Export", variant="success", id="export")
         delete_button = Button("Delete", variant="warning", id="delete")
         add_button.focus()
         buttons_panel = Vertical(
@@ -122,6 +199,7 @@ class Home(Screen):
             modify_button,
             search_button,
             upload_csv_button,
+            export_button,
             delete_button,
             Static(classes="separator"),
             classes="buttons-panel",
@@ -129,84 +207,201 @@ class Home(Screen):
         yield Horizontal(self.linel_list, buttons_panel)
         yield Footer()
 
-    def on_mount(self):
+    async def on_mount(self):
         self.db = self.app.db
-        self._load_words()
+        await self._load_words()
 
-    def _load_words(self):
+    async def _load_words(self):
+        self.marked.clear()
+        self._show_window(await self.db.get_words_page(0, self.WINDOW_SIZE))
+
+    def _show_window(self, words, cursor_row=0):
         words_list = self.query_one(DataTable)
         words_list.clear()
-        words = self.db.get_all_words()
-    
+        self.window = []
+
         for word_data in words:
-            word_id = word_data[0]
+            word_id = word_data.id
             if word_id:
-                words_list.add_row(word_id, *word_data[1:], key=str(word_id))
+                label = f"* {word_id}" if str(word_id) in self.marked else word_id
+                words_list.add_row(label, *word_data[1:], key=str(word_id))
+                self.window.append(word_data)
             else:
                 print(f"Invalid word ID: {word_id} for word: {word_data}")
 
+        if self.window:
+            words_list.move_cursor(row=cursor_row, animate=False)
+
+    @on(DataTable.RowHighlighted)
+    async def _page_words(self):
+        words_list = self.query_one(DataTable)
+        cursor_row = words_list.cursor_row
+        margin = self.PAGE_SIZE // 2
+
+        if not self.window:
+            return
+
+        if cursor_row >= len(self.window) - margin:
+            words = await self.db.get_words_page(self.window[-1].id, self.PAGE_SIZE)
+            if words:
+                shift = max(0, len(self.window) + len(words) - self.WINDOW_SIZE)
+                self._show_window(self.window[shift:] + words, cursor_row - shift)
+        elif cursor_row < margin:
+            words = await self.db.get_words_page_before(self.window[0].id, self.PAGE_SIZE)
+            if words:
+                kept = self.window[:self.WINDOW_SIZE - len(words)]
+                self._show_window(words + kept, cursor_row + len(words))
+
+    async def _insert_row(self, word_record):
+        words_list = self.query_one(DataTable)
+        word_id = word_record.id
+
+        # New words always get the highest id, so they belong at the end of
+        # the window only when the window already reaches the last page.
+        if self.window and await self.db.get_words_page(self.window[-1].id, 1) != [word_record]:
+            self._show_window(
+                await self.db.get_words_page_before(word_id + 1, self.WINDOW_SIZE),
+            )
+        else:
+            words_list.add_row(word_id, *word_record[1:], key=str(word_id))
+            self.window.append(word_record)
+            if len(self.window) > self.WINDOW_SIZE:
+                first_id = self.window.pop(0).id
+                words_list.remove_row(str(first_id))
+
+        words_list.move_cursor(row=words_list.get_row_index(str(word_id)))
+
+    def _patch_row(self, word_record):
+        words_list = self.query_one(DataTable)
+        row_key = str(word_record.id)
+
+        if row_key not in words_list.rows:
+            return
+
+        self.window[words_list.get_row_index(row_key)] = word_record
+        for column_key, value in zip(self.columns[1:], word_record[1:]):
+            words_list.update_cell(row_key, column_key, value)
+
     @on(Button.Pressed, "#add")
     def action_add(self):
-        def check_word(word_data):
+        async def check_word(word_data):
             if word_data:
-                self.db.add_word(word_data)
-                self._load_words()
+                await self._insert_row(await self.db.add_word(word_data))
 
         self.app.push_screen(AddDialog(), check_word)
 
-    @on(Button.Pressed, "#modify")
-    def action_modify(self):
+    def _selected_row_keys(self):
         words_list = self.query_one(DataTable)
 
+        if self.marked:
+            return sorted(self.marked, key=lambda row_key: int(row_key.value))
+
         if words_list.cursor_coordinate == (0,0):
             print("No row selected")
-            return
-        
+            return []
+
         row_key, _ = words_list.coordinate_to_cell_key(words_list.cursor_coordinate)
-            
-        word_data = words_list.get_row(row_key)
-        
-        if not word_data:
-            print(f"No data found for the selected row {row_key}")
+        return [row_key]
+
+    def action_mark(self):
+        words_list = self.query_one(DataTable)
+
+        if not words_list.row_count:
             return
 
-        word_id = row_key.value
-        word_record = self.db.get_word_by_id(int(word_id))
+        row_key, _ = words_list.coordinate_to_cell_key(words_list.cursor_coordinate)
+
+        if row_key in self.marked:
+            self.marked.discard(row_key)
+            words_list.update_cell(row_key, self.columns[0], row_key.value)
+        else:
+            self.marked.add(row_key)
+            words_list.update_cell(row_key, self.columns[0], f"* {row_key.value}")
 
-        def handle_update(updated_word):
-            if updated_word:
-                self.db.update_word(word_id, updated_word)
-                self._load_words()
-        
-        self.app.push_screen(UpdateDialog(word_record), handle_update)
+    def _clear_marks(self):
+        words_list = self.query_one(DataTable)
+
+        for row_key in self.marked:
+            if row_key in words_list.rows:
+                words_list.update_cell(row_key, self.columns[0], row_key.value)
+        self.marked.clear()
+
+    @on(Button.Pressed, "#modify")
+    async def action_modify(self):
+        row_keys = self._selected_row_keys()
+        updates = []
+
+        # Marked rows are edited one dialog after the other and written
+        # together once the last dialog is closed.
+        async def edit_next(remaining):
+            if not remaining:
+                if updates:
+                    for word_record in await self.db.update_words(updates):
+                        self._patch_row(word_record)
+                self._clear_marks()
+                return
+
+            word_id = remaining[0].value
+            word_record = await self.db.get_word_by_id(int(word_id))
+
+            if not word_record:
+                print(f"No data found for the selected row {word_id}")
+                await edit_next(remaining[1:])
+                return
+
+            async def handle_update(updated_word):
+                if updated_word:
+                    updates.append((word_id, updated_word))
+                await edit_next(remaining[1:])
+
+            self.app.push_screen(UpdateDialog(word_record), handle_update)
+
+        await edit_next(row_keys)
 
     @on(Button.Pressed, "#search")
     def action_search(self):
+        from linel.screens.query import QueryScreen
+
         self.app.push_screen(QueryScreen(self.db))
 
     @on(Button.Pressed, "#upload_csv")
     def action_upload_csv(self):
+        from linel.screens.csv_import import CSVSelectionScreen
+
         self.app.push_screen(CSVSelectionScreen(self.db))
 
+    @on(Button.Pressed, "#export")
+    def action_export(self):
+        from linel.screens.export import ExportScreen
+
+        self.app.push_screen(ExportScreen(self.db))
+
     @on(Button.Pressed, "#delete")
-    def action_delete(self):
+    async def action_delete(self):
         words_list = self.query_one(DataTable)
+        row_keys = self._selected_row_keys()
 
-        if words_list.cursor_coordinate == (0,0):
-            print("No row selected")
+        if not row_keys:
             return
-        
-        row_key, _ = words_list.coordinate_to_cell_key(words_list.cursor_coordinate)
 
-
-        def check_answer(accepted):
+        async def check_answer(accepted):
             if accepted:
-                self.db.delete_word(id=row_key.value)
-                words_list.remove_row(row_key)
+                deleted = {row_key.value for row_key in row_keys}
+                await self.db.delete_words(deleted)
+                for row_key in row_keys:
+                    if row_key in words_list.rows:
+                        words_list.remove_row(row_key)
+                self.window = [word for word in self.window if str(word.id) not in deleted]
+                self.marked.clear()
+
+        if len(row_keys) == 1:
+            word = (await self.db.get_word_by_id(int(row_keys[0].value))).word
+            question = f"Do you want to delete {word}?"
+        else:
+            question = f"Do you want to delete {len(row_keys)} words?"
 
-        word = words_list.get_row(row_key)[1]
         self.app.push_screen(
-            QuestionDialog(f"Do you want to delete {word}?"),
+            QuestionDialog(question),
                 check_answer,
         )
 
@@ -224,7 +419,8 @@ class LinelApp(App):
         ("q", "request_quit", "Quit"),
         ("h", "switch_home", "Home"),
         ("b", "switch_about", "About"),
-        ("w","switch_generator", "Word Generator")
+        ("w","switch_generator", "Word Generator"),
+        Binding("f12", "show_profile", "Profile", show=False),
     ]
 
     def __init__(self, *args, **kwargs):
@@ -232,7 +428,27 @@ class LinelApp(App):
         self.db = None
 
     def set_database(self, db_path):
-        self.db = Database(db_path)
+        from linel.async_database import AsyncDatabase
+
+        if self.db:
+            self.db.close()
+        self.db = AsyncDatabase(db_path)
+
+    def push_screen(self, screen, *args, **kwargs):
+        # With profiling on, times compose and mount up to the first paint.
+        start = time.perf_counter()
+        result = super().push_screen(screen, *args, **kwargs)
+        if profiler.enabled and isinstance(screen, Screen):
+            name = type(screen).__name__
+            screen.call_after_refresh(
+                lambda: profiler.record("screen", name, time.perf_counter() - start)
+            )
+        return result
+
+    def on_unmount(self):
+        # Let the database thread finish its queue and close the connection.
+        if self.db:
+            self.db.close(wait=True)
 
     def on_mount(self):
         self.title = "LINEL"
@@ -246,6 +462,8 @@ class LinelApp(App):
         self.push_screen(About())
 
     def switch_to_gen(self):
+        from linel.screens.generator import WordGeneratorScreen
+
         self.push_screen(WordGeneratorScreen())
 
     @on(Button.Pressed, "#back")
@@ -270,6 +488,11 @@ class LinelApp(App):
     def action_switch_generator(self):
         self.switch_to_gen()
 
+    def action_show_profile(self):
+        from linel.screens.profile import ProfileScreen
+
+        self.push_screen(ProfileScreen())
+
 class QuestionDialog(Screen):
     def __init__(self, message, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -366,42 +589,42 @@ class UpdateDialog(Screen):
             Label("Update Word", id="title"),
             Label("Word:", classes="label"),
             Input(
-                value=self.word_record[1],
+                value=self.word_record.word,
                 placeholder="Word",
                 classes="input",
                 id="input-word",
             ),
             Label("Type:", classes="label"),
             Input(
-                value=self.word_record[2],
+                value=self.word_record.type,
                 placeholder="Type",
                 classes="input",
                 id="input-type",
             ),
             Label("English:", classes="label"),
             Input(
-                value=self.word_record[3],
+                value=self.word_record.english,
                 placeholder="English",
                 classes="input",
                 id="input-english",
             ),
             Label("Class/Declination:", classes="label"),
             Input(
-                value=self.word_record[4],
+                value=self.word_record.class_decl,
                 placeholder="Class/Declination",
                 classes="input",
                 id="input-class_decl",
             ),
             Label("Root:", classes="label"),
             Input(
-                value=self.word_record[5],
+                value=self.word_record.root,
                 placeholder="Root",
                 classes="input",
                 id="input-root",
             ),
             Label("Notes:", classes="label"),
             Input(
-                value=self.word_record[6],
+                value=self.word_record.notes,
                 placeholder="Notes",
                 classes="input",
                 id="input-notes",
@@ -424,205 +647,3 @@ class UpdateDialog(Screen):
         updated_word = (new_word, new_type, new_english, new_class_decl, new_root, new_notes)
         
         self.dismiss(updated_word)
-
-class QueryScreen(Screen):
-
-    def __init__(self, db):
-        super().__init__()
-        self.db = db
-
-    def compose(self):
-        yield Header()
-        yield Grid(
-            Label("Search", id="title"),
-            Label("Word:", classes="label"),
-            Input(
-                value=None,
-                placeholder="Word",
-                classes="input",
-                id="input-word",
-            ),
-            Label("Type:", classes="label"),
-            Input(
-                value=None,
-                placeholder="Type",
-                classes="input",
-                id="input-type",
-            ),
-            Label("English:", classes="label"),
-            Input(
-                value=None,
-                placeholder="English",
-                classes="input",
-                id="input-english",
-            ),
-            Label("Class/Declination:", classes="label"),
-            Input(
-                value=None,
-                placeholder="Class/Declination",
-                classes="input",
-                id="input-class_decl",
-            ),
-            Label("Root:", classes="label"),
-            Input(
-                value=None,
-                placeholder="Root",
-                classes="input",
-                id="input-root",
-            ),
-            Static(),
-            Button("Search", variant="success", id="search"),
-            Button("Cancel", variant="warning", id="back"),
-            id="input-dialog",
-        )
-
-        self.linel_list = DataTable(classes="Words-list")
-        self.linel_list.focus()
-        self.linel_list.add_columns("ID","Word", "Type", "English", "Class/Declinations", "Root", "Notes")
-        self.linel_list.cursor_type = "row"
-        self.linel_list.zebra_stripes = True
-
-        yield Horizontal(self.linel_list)
-
-        yield Footer()
-
-        
-    @on(Button.Pressed, "#search")
-    def action_search(self):
-        words_list = self.query_one(DataTable)
-        words_list.clear()
-        word = self.query_one("#input-word", Input).value
-        type = self.query_one("#input-type", Input).value
-        english = self.query_one("#input-english", Input).value
-        class_decl = self.query_one("#input-class_decl", Input).value
-        root = self.query_one("#input-root", Input).value
-        words = self.db.query_words(word, type, english, class_decl, root)
-        
-        for word_data in words:
-            words_list.add_row(*word_data[0:])
-
-class CSVSelectionScreen(Screen):
-
-    def __init__(self, db):
-        super().__init__()
-        self.db = db
-
-    def compose(self):
-
-        csv_dir = pathlib.Path(__file__).parent / "database"
-        csv_files = [f for f in os.listdir(csv_dir) if f.endswith(".csv")]
-
-        if not csv_files:
-            yield Label("No CSV found in the 'database' folder.")
-            yield Button("Cancel", id="cancel")
-        else:
-            yield Label("Select a csv to load:")
-            self.selection = Select.from_values(csv_files)
-            yield self.selection
-
-            yield Button("Load", id="load")
-            yield Button("Cancel", id="back")     
-
-    @on(Button.Pressed, "#load")
-    def action_load(self):
-        selected_csv = self.selection.value
-    
-        if not selected_csv == Select.BLANK:
-            csv_path = pathlib.Path(__file__).parent / "database" / selected_csv
-            with open(csv_path, newline='') as csvfile:
-                reader = csv.DictReader(csvfile)
-                records = [row for row in reader]
-
-                for record in records:
-                    word = record.get("word")
-                    type = record.get("type")
-                    english = record.get("english")
-                    class_decl = record.get("class_decl")
-                    root = record.get("root")
-                    notes = record.get("notes")
-
-                    added_word = (word, type, english, class_decl, root, notes)
-                    self.db.add_word(added_word)
-
-            self.app.switch_to_home()
-        else:
-            print("No CSV selected")
-
-
-class WordGeneratorScreen(Screen):
-
-    def __init__(self):
-        super().__init__()
-        self.phon = {}
-        self.syl = []
-        self.load_default_patterns()
-
-
-    def load_default_patterns(self):
-        base_dir = pathlib.Path(__file__).parent / "phonology"
-        sounds_file = base_dir / "sounds.txt"
-        syllables_file = base_dir / "syllables.txt"
-
-        if sounds_file.exists():
-            with open(sounds_file, "r") as f:
-                self.default_sounds = f.read()
-        else:
-            self.default_sounds = ""
-
-        if syllables_file.exists():
-            with open(syllables_file, "r") as f:
-                self.default_syllables = f.read()
-        else:
-            self.default_syllables = ""
-    
-    def compose(self) -> ComposeResult:
-        yield Header()
-        yield Label("Number of Words to Generate:")
-        self.num_input = Input(placeholder="Enter a number", id="num_input")
-        yield self.num_input
-
-        yield Label("Phonological Categories (sounds.txt):")
-        self.sounds_input = TextArea(text=self.default_sounds, id="sounds_input")
-        yield self.sounds_input
-
-        yield Label("Syllable Structures (syllables.txt):")
-        self.syllables_input = TextArea(text=self.default_syllables, id="syllables_input")
-        yield self.syllables_input
-
-        yield Button("Generate Words", id="generate")
-
-        self.output = TextArea(read_only=True, id="output")
-        yield Label("Generated Words:")
-        yield self.output
-
-        yield Footer()
-
-    def load_patterns(self):
-        ph = self.sounds_input.text.splitlines()
-        syl = self.syllables_input.text.splitlines()
-
-        for cat in ph:
-            phrase = cat.split("=")
-            if len(phrase) == 2:
-                self.phon[phrase[0]] = phrase[1].split(",")
-
-        self.syl = syl
-
-    def generate_words(self):
-        num_words = int(self.num_input.value or 10)
-
-        words = [self.gen_word() for _ in range(num_words)]
-        self.output.text = "\n".join(words)
-
-    def gen_word(self):
-        structure = random.choice(self.syl)
-        sounds = [random.choice(self.phon[category]) for category in structure]
-        return "".join(sounds)
-
-    @on(Button.Pressed, "#generate")
-    def action_generate(self):
-        if self.sounds_input.text and self.syllables_input.text:
-            self.load_patterns()
-            self.generate_words()
-        else:
-            self.output.text = "Please provide content for both sounds and syllables."
\ No newline at end of file
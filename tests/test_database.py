@@ -0,0 +1,110 @@
+import threading
+
+import pytest
+
+from linel.database import Database
+
+
+def open_lexicon(tmp_path, name="lexicon.db"):
+    return Database(tmp_path / name)
+
+
+def test_add_duplicate_after_upsert_import(tmp_path):
+    db = open_lexicon(tmp_path)
+    db.bulk_add_words([("kesi", "Verb", "Live, to", "", "kes", "")])
+
+    report = db.bulk_add_words(
+        [("kesi", "Verb", "Dwell, to", "", "kes", ""), ("marvi", "Verb", "Die, to", "", "marv", "")],
+        upsert_key="word,type",
+    )
+    assert (report.inserted, report.updated, report.unchanged) == (1, 1, 0)
+    assert db.query_words(word="kesi")[0].english == "Dwell, to"
+
+    # The key of the import must not turn into a constraint of the lexicon.
+    added = db.add_word(("kesi", "Verb", "Live, to", "", "kes", ""))
+    assert added.word == "kesi"
+    db.bulk_add_words([("marvi", "Verb", "Die, to", "", "marv", "")])
+    assert db.count_words() == 4
+    db.close()
+
+
+def test_upsert_import_rejects_duplicate_keys_in_lexicon(tmp_path):
+    db = open_lexicon(tmp_path)
+    db.bulk_add_words([("kesi", "Verb", "", "", "", "")] * 2)
+
+    with pytest.raises(ValueError):
+        db.bulk_add_words([("kesi", "Verb", "Live, to", "", "", "")], upsert_key="word,type")
+    assert db.count_words() == 2
+    db.close()
+
+
+def indexes(db):
+    return db._read_query("SELECT name FROM sqlite_master WHERE type = 'index' ORDER BY name;").fetchall()
+
+
+def test_upsert_import_leaves_no_index(tmp_path):
+    db = open_lexicon(tmp_path)
+    db.bulk_add_words([("kesi", "Verb", "Live, to", "", "kes", "")])
+    before = indexes(db)
+
+    for key in ("word,type", "english"):
+        report = db.bulk_add_words([("kesi", "Verb", "Live, to", "", "kes", key)], upsert_key=key)
+        assert report.updated == 1
+        assert indexes(db) == before
+    db.close()
+
+
+def test_import_csv_reads_utf8_and_counts_bytes(tmp_path):
+    rows = "".join(f"kesi{i},Noun,Thing {i},3°,kes,ñ\r\n" for i in range(50))
+    csv_path = tmp_path / "words.csv"
+    csv_path.write_bytes(("﻿word,type,english,class_decl,root,notes\r\n" + rows).encode("utf-8"))
+    db = open_lexicon(tmp_path)
+
+    positions = []
+    report = db.import_csv(csv_path, chunk_size=10, progress=lambda report: positions.append(report.position))
+    assert report.inserted == 50
+    assert db.query_words(word="kesi0")[0].class_decl == "3°"
+    assert all(position <= report.size for position in positions)
+    assert positions[-1] == report.position == report.size
+    db.close()
+
+
+def test_writes_of_another_object_wait_for_a_transaction(tmp_path):
+    first = open_lexicon(tmp_path)
+    second = open_lexicon(tmp_path)
+    started = threading.Event()
+
+    def add_from_thread():
+        started.set()
+        second.add_word(("marvi", "Verb", "Die, to", "", "marv", ""))
+
+    with pytest.raises(RuntimeError):
+        with first.transaction():
+            first.add_word(("kesi", "Verb", "Live, to", "", "kes", ""))
+            thread = threading.Thread(target=add_from_thread)
+            thread.start()
+            started.wait()
+            # The other write must neither commit this one nor be lost
+            # with it.
+            thread.join(0.2)
+            assert thread.is_alive()
+            raise RuntimeError
+
+    thread.join()
+    assert [word.word for word in second.get_all_words()] == ["marvi"]
+    first.close()
+    second.close()
+
+
+def test_nested_objects_share_a_transaction(tmp_path):
+    first = open_lexicon(tmp_path)
+    second = open_lexicon(tmp_path)
+
+    with pytest.raises(RuntimeError):
+        with first.transaction():
+            second.add_word(("kesi", "Verb", "Live, to", "", "kes", ""))
+            raise RuntimeError
+
+    assert first.count_words() == 0
+    first.close()
+    second.close()
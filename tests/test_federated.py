@@ -0,0 +1,53 @@
+import sqlite3
+
+from linel.connections import connections
+from linel.database import Database
+from linel.federated import FederatedSearch
+
+
+def legacy_lexicon(path):
+    # A lexicon from before schema versioning: only the words table.
+    db = sqlite3.connect(path)
+    db.execute(
+        "CREATE TABLE words (id INTEGER PRIMARY KEY, word TEXT, type TEXT, english TEXT, "
+        "class_decl TEXT, root TEXT, notes TEXT);"
+    )
+    db.execute("INSERT INTO words VALUES (NULL, 'kesi', 'Verb', 'Live, to', '', 'kes', '');")
+    db.commit()
+    db.close()
+
+
+def file_state(path):
+    db = sqlite3.connect(path)
+    try:
+        return db.execute("PRAGMA journal_mode;").fetchone()[0], db.execute("PRAGMA user_version;").fetchone()[0]
+    finally:
+        db.close()
+
+
+def test_search_leaves_lexicons_untouched(tmp_path):
+    legacy_lexicon(tmp_path / "old.db")
+    db = Database(tmp_path / "new.db")
+    db.add_word(("kesmi", "Noun", "Life", "", "kes", ""))
+    db.close()
+    connections.close_all()
+    before = {path.name: file_state(path) for path in tmp_path.glob("*.db")}
+
+    search = FederatedSearch(sorted(tmp_path.glob("*.db")))
+    found = sorted(row[1] for _, rows in search.run("prefix", word="kes") for row in rows)
+    assert found == ["kesi", "kesmi"]
+    assert search.errors == []
+
+    # Too old for fuzzy search: reported, not upgraded.
+    list(search.run("fuzzy", word="kesi"))
+    assert [source for source, _ in search.errors] == ["old"]
+
+    connections.close_all()
+    assert {path.name: file_state(path) for path in tmp_path.glob("*.db")} == before
+
+
+def test_search_does_not_create_missing_files(tmp_path):
+    search = FederatedSearch([tmp_path / "missing.db"])
+    assert list(search.run("exact", word="kesi")) == []
+    assert [source for source, _ in search.errors] == ["missing"]
+    assert not (tmp_path / "missing.db").exists()
@@ -0,0 +1,103 @@
+import random
+
+import pytest
+
+from linel.database import Database, ImportCancelled, edit_distance, trigrams
+
+
+def random_words(count, seed=1):
+    # Short words over a small alphabet, so that many are close to each
+    # other but none to the words added by the tests, and some roots empty.
+    rng = random.Random(seed)
+    words = []
+    for _ in range(count):
+        word = "".join(rng.choice("bdglnopu") for _ in range(rng.randint(1, 7)))
+        root = word[:rng.randint(0, len(word))]
+        words.append((word, "Noun", "", "", root, ""))
+    return words
+
+
+def brute_force(db, word=None, root=None, distance=1):
+    found = []
+    for row in db.get_all_words():
+        distances = [
+            edit_distance(value or "", searched)
+            for value, searched in ((row.word, word), (row.root, root))
+            if searched
+        ]
+        if max(distances) <= distance:
+            found.append((sum(distances), row.id))
+    return [word_id for _, word_id in sorted(found)]
+
+
+def stored_grams(db):
+    return set(db._read_query("SELECT field, gram, word_id FROM word_grams;").fetchall())
+
+
+def expected_grams(db):
+    grams = set()
+    for row in db.get_all_words():
+        for field in ("word", "root"):
+            if getattr(row, field):
+                grams.update((field, gram, row.id) for gram in trigrams(getattr(row, field)))
+    return grams
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = Database(tmp_path / "lexicon.db")
+    yield db
+    db.close()
+
+
+@pytest.mark.parametrize("distance", [1, 2, 3])
+def test_fuzzy_search_matches_brute_force(db, distance):
+    db.bulk_add_words(random_words(2000))
+
+    matched = 0
+    for searched in ("o", "bu", "lop", "gudo", "boplun", "dolpugo"):
+        expected = brute_force(db, word=searched, distance=distance)
+        matched += len(expected)
+        results = db.search_words("fuzzy", word=searched, distance=distance)
+        assert [row.id for row in results] == expected
+
+        results = db.search_words("fuzzy", word=searched, root=searched[:2], distance=distance)
+        assert [row.id for row in results] == brute_force(db, searched, searched[:2], distance)
+    assert matched
+
+
+def test_bulk_import_indexes_grams_like_the_triggers(db, tmp_path):
+    words = random_words(300)
+    db.bulk_add_words(words)
+
+    other = Database(tmp_path / "other.db")
+    for word in words:
+        other.add_word(word)
+
+    assert stored_grams(db) == expected_grams(db) == stored_grams(other)
+    assert db._read_query("SELECT COUNT(*) FROM word_grams_deferred;").fetchone()[0] == 0
+    other.close()
+
+
+def test_grams_follow_updates_and_deletes(db):
+    db.bulk_add_words(random_words(50))
+    kesi = db.add_word(("kesi", "Verb", "Live, to", "", "kes", ""))
+    assert stored_grams(db) == expected_grams(db)
+
+    db.update_word(kesi.id, ("marvi", "Verb", "Die, to", "", "", ""))
+    assert stored_grams(db) == expected_grams(db)
+    assert [row.word for row in db.search_words("fuzzy", word="marve")] == ["marvi"]
+    assert not db.search_words("fuzzy", word="kesi", root="kes")
+
+    db.delete_word(kesi.id)
+    assert stored_grams(db) == expected_grams(db)
+    assert not db.search_words("fuzzy", word="marvi")
+
+
+def test_cancelled_import_leaves_no_grams(db):
+    db.bulk_add_words(random_words(20))
+    before = stored_grams(db)
+
+    with pytest.raises(ImportCancelled):
+        db.bulk_add_words(random_words(100, seed=2), chunk_size=10, progress=lambda report: False)
+    assert stored_grams(db) == before
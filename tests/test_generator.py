@@ -0,0 +1,36 @@
+import itertools
+
+import pytest
+
+from linel.generator import WordEnumerator, parse_sound
+
+RECURSIVE_SOUNDS = "C=p,t,d,k,f,v,s,sh,m,n,l,r\nA=a,aCA"
+
+
+def test_enumerate_recursive_category_without_listing_it():
+    # Far too many sounds to list A; only the words read are built.
+    enumerator = WordEnumerator(RECURSIVE_SOUNDS, "CA")
+    words = [word for _, word in itertools.islice(enumerator.iter_words(), 4)]
+
+    assert words == ["pa", "papa", "papapa", "papapapa"]
+    assert enumerator.total > 10 ** 6
+    offset, word = next(enumerator.iter_words(enumerator.total - 1))
+    assert offset == enumerator.total - 1 and word.startswith("ra")
+
+
+def test_enumeration_resumes_at_any_offset():
+    enumerator = WordEnumerator(RECURSIVE_SOUNDS, "CA", max_depth=2)
+    words = list(enumerator.iter_words())
+
+    assert len(words) == enumerator.total
+    assert len(set(word for _, word in words)) == enumerator.total
+    for offset in (0, 1, 17, enumerator.total // 2, enumerator.total - 1):
+        assert next(enumerator.iter_words(offset)) == words[offset]
+
+
+def test_invalid_weights_are_rejected():
+    for weight in ("-1", "x", "nan", "inf"):
+        with pytest.raises(ValueError, match="Invalid weight"):
+            parse_sound(f"t:{weight}")
+    assert parse_sound("t:0") == ("t", 0.0)
+    assert parse_sound("t:2.5") == ("t", 2.5)
@@ -0,0 +1,110 @@
+import pytest
+
+from linel.database import Database, ImportCancelled
+from linel.morphology import parse_rules
+
+RULES = parse_rules("""
+Noun  1  genitive  root+i
+Noun  2  plural    word-1+e
+Noun  *  dative    word+ra
+Verb  *  negative  na+word
+Verb  *  past      root-9+en
+""")
+
+WORDS = [
+    ("varka", "Noun", "House", "1", "vark", ""),
+    ("telu", "Noun", "Tree", "2", "tel", ""),
+    ("sor", "Noun", "Sun", "", "", ""),
+    ("kesi", "Verb", "Live, to", "", "kes", ""),
+    ("marvi", "Verb", "Die, to", "", "", ""),
+    ("anta", "Adjective", "Big", "", "ant", ""),
+]
+
+
+def expected_forms(db):
+    # What the rules make of every word, worked out in Python.
+    rules = db._read_query("SELECT id, type, class_decl, prefix, base, strip, suffix FROM paradigm_rules;")
+    rules = rules.fetchall()
+    forms = set()
+    for word in db.get_all_words():
+        for rule_id, type, class_decl, prefix, base, strip, suffix in rules:
+            stem = (word.root if base == "root" else word.word) or ""
+            if type == word.type and class_decl in (word.class_decl or "", "*") and stem:
+                forms.add((word.id, rule_id, prefix + stem[:max(0, len(stem) - strip)] + suffix))
+    return forms
+
+
+def stored_forms(db):
+    return set(db._read_query("SELECT word_id, rule_id, form FROM word_forms;").fetchall())
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = Database(tmp_path / "lexicon.db")
+    yield db
+    db.close()
+
+
+def test_rules_build_the_forms_of_existing_words(db):
+    db.bulk_add_words(WORDS)
+    assert db.set_paradigm_rules(RULES) == len(expected_forms(db))
+    assert stored_forms(db) == expected_forms(db)
+
+    varka = db.query_words(word="varka")[0]
+    assert db.paradigm(varka.id) == [("genitive", "varki"), ("dative", "varkara")]
+    assert [(word.word, name) for word, name in db.lookup_form("navarka")] == []
+    assert [(word.word, name) for word, name in db.lookup_form("nakesi")] == [("kesi", "negative")]
+    # A strip longer than the stem leaves only the affixes.
+    assert [(word.word, name) for word, name in db.lookup_form("en")] == [("kesi", "past")]
+
+
+def test_forms_follow_inserts_updates_and_deletes(db):
+    db.set_paradigm_rules(RULES)
+    telu = db.add_word(("telu", "Noun", "Tree", "2", "tel", ""))
+    assert db.paradigm(telu.id) == [("plural", "tele"), ("dative", "telura")]
+
+    db.update_word(telu.id, ("telu", "Verb", "Grow, to", "", "tel", ""))
+    assert db.paradigm(telu.id) == [("negative", "natelu"), ("past", "en")]
+    assert [word.word for word in db.search_words("form", word="natelu")] == ["telu"]
+    assert not db.search_words("form", word="tele")
+
+    db.delete_word(telu.id)
+    assert db.paradigm(telu.id) == []
+    assert stored_forms(db) == set()
+
+
+def test_forms_follow_rule_changes(db):
+    db.bulk_add_words(WORDS)
+    db.set_paradigm_rules(RULES)
+
+    db._run_query("UPDATE paradigm_rules SET suffix = 'o' WHERE name = 'genitive';")
+    assert stored_forms(db) == expected_forms(db)
+    assert [word.word for word in db.search_words("form", word="varko")] == ["varka"]
+
+    db._run_query("DELETE FROM paradigm_rules WHERE name = 'dative';")
+    assert stored_forms(db) == expected_forms(db)
+    assert not db.search_words("form", word="varkara")
+
+    db.set_paradigm_rules(RULES[:1])
+    assert stored_forms(db) == expected_forms(db)
+    assert db.get_paradigm_rules() == RULES[:1]
+
+
+def test_bulk_import_defers_the_forms(db, tmp_path):
+    db.set_paradigm_rules(RULES)
+    db.bulk_add_words(WORDS * 3, chunk_size=4)
+    assert stored_forms(db) == expected_forms(db)
+    assert db._read_query("SELECT COUNT(*) FROM word_grams_deferred;").fetchone()[0] == 0
+
+    # The same forms as the per-row triggers.
+    other = Database(tmp_path / "other.db")
+    other.set_paradigm_rules(RULES)
+    for word in WORDS * 3:
+        other.add_word(word)
+    assert stored_forms(other) == stored_forms(db)
+    other.close()
+
+    before = stored_forms(db)
+    with pytest.raises(ImportCancelled):
+        db.bulk_add_words(WORDS, progress=lambda report: False)
+    assert stored_forms(db) == before
@@ -0,0 +1,21 @@
+from linel.database import Database
+from linel.profiling import profiler
+
+
+def test_reads_are_timed_through_their_rows(tmp_path):
+    db = Database(tmp_path / "lexicon.db")
+    db.bulk_add_words([(f"word{i}", "Noun", "", "", "", "") for i in range(50)])
+
+    profiler.enable()
+    try:
+        db.get_all_words()
+        with db.reading() as connection:
+            for _ in db.iter_search_words("prefix", word="word1", connection=connection):
+                pass
+    finally:
+        profiler.disable()
+        db.close()
+
+    records = list(profiler.records)
+    profiler.clear()
+    assert [record["rows"] for record in records] == [50, 11]